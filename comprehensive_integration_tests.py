@@ -1,11 +1,25 @@
-import unittest
+import pytest
 import sys
 import os
+import copy
+import importlib.util
 import json
 import tempfile
-from datetime import datetime
+from types import MappingProxyType
 from unittest.mock import Mock, patch, MagicMock
 
+# Events headed for Splunk/XSOAR are serialized with orjson when available
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj).decode()
+
+    _loads = orjson.loads
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
+
 # Add paths for modules
 sys.path.insert(0, '/home/Great/SRS-Protocol')
 sys.path.insert(0, '/home/Great/SRS-Protocol/xsoar_integration')
@@ -18,572 +32,589 @@ class MockOrasrsAgent:
         pass
 
 # Mock the orasrs_agent module
+_mock_attrs = {
+    'OrasrsAgent': MockOrasrsAgent,
+    'AgentConfig': Mock,
+    'ThreatEvidence': Mock,
+    'ThreatType': Mock,
+    'ThreatLevel': Mock,
+    'ThreatIntelAggregator': Mock,
+    'ConsensusEngine': Mock(),
+    'CredibilityEngine': Mock(),
+    'consensus_verification': Mock(),
+    'credibility_enhancement': Mock(),
+    'crypto': Mock(),
+    'CryptoProvider': Mock(),
+}
 sys.modules['orasrs_agent'] = Mock()
-sys.modules['orasrs_agent'].OrasrsAgent = MockOrasrsAgent
-sys.modules['orasrs_agent'].AgentConfig = Mock
-sys.modules['orasrs_agent'].ThreatEvidence = Mock
-sys.modules['orasrs_agent'].ThreatType = Mock
-sys.modules['orasrs_agent'].ThreatLevel = Mock
-sys.modules['orasrs_agent'].ThreatIntelAggregator = Mock
-sys.modules['orasrs_agent'].ConsensusEngine = Mock()
-sys.modules['orasrs_agent'].CredibilityEngine = Mock()
-sys.modules['orasrs_agent'].consensus_verification = Mock()
-sys.modules['orasrs_agent'].credibility_enhancement = Mock()
-sys.modules['orasrs_agent'].crypto = Mock()
-sys.modules['orasrs_agent'].CryptoProvider = Mock()
+sys.modules['orasrs_agent'].__dict__.update(_mock_attrs)
 sys.modules['orasrs_agent'].CryptoProvider.blake3_hash = lambda x: "mock_hash"
 
-# Import test modules (skip XSOAR due to dependency issues in test environment)
-from splunk_app_tests import TestSplunkApp, TestSplunkAppIntegration
-# from xsoar_integration_tests import TestXSOARIntegration, TestXSOARIntegrationExceptionHandling
-from pfsense_plugin_tests import TestPFSensePlugin, TestPFSensePluginFiles, TestPFSensePluginSecurity
-
-
-class TestOraSRSIntegration(unittest.TestCase):
-    """Comprehensive integration tests for OraSRS v2.0 ecosystem"""
-    
-    def setUp(self):
-        """Set up test fixtures before each test method."""
-        self.test_results = {
-            'protocol_tests_passed': 0,
-            'protocol_tests_total': 0,
-            'splunk_tests_passed': 0,
-            'splunk_tests_total': 0,
-            'xsoar_tests_passed': 0,
-            'xsoar_tests_total': 0,
-            'pfsense_tests_passed': 0,
-            'pfsense_tests_total': 0
-        }
-    
-    def test_protocol_component_interactions(self):
-        """Test that protocol components work together correctly"""
-        # This test verifies that the core protocol components can interact
-        # Testing the flow: Threat detection -> Consensus -> Credibility -> Action
-        
-        # Mock the main components
-        from unittest.mock import MagicMock
-        
-        mock_aggregator = MagicMock()
-        mock_aggregator.get_sources_config.return_value = [
-            {'name': 'CISA_AIS', 'enabled': True}
-        ]
-        mock_aggregator.fetch_all_sources.return_value = [
-            {
-                'id': 'test-threat-1',
-                'source_ip': '192.168.1.100',
-                'credibility_score': 0.85,
-                'consensus_verified': True
-            }
-        ]
-        
-        mock_consensus_engine = MagicMock()
-        mock_consensus_engine.check_consensus.return_value = {
-            'evidence_id': 'test-threat-1',
-            'consensus_verdict': True,
-            'confidence_score': 0.9,
-            'consensus_percentage': 0.8
-        }
-        
-        mock_credibility_engine = MagicMock()
-        mock_credibility_engine.calculate_credibility_score.return_value = 0.88
-        mock_credibility_engine.enhance_threat_evidence = lambda ev, conf: ev
-        
-        # Simulate the interaction flow
-        threat_data = mock_aggregator.fetch_all_sources()
-        self.assertIsNotNone(threat_data)
-        self.assertGreater(len(threat_data), 0)
-        
-        # Process through consensus
-        consensus_result = mock_consensus_engine.check_consensus('test-request-id')
-        self.assertIsNotNone(consensus_result)
-        self.assertTrue(consensus_result['consensus_verdict'])
-        
-        # Apply credibility
-        credibility_score = mock_credibility_engine.calculate_credibility_score({}, 0.9)
-        self.assertGreaterEqual(credibility_score, 0.0)
-        self.assertLessEqual(credibility_score, 1.0)
-        
-        print("✓ Protocol components can interact correctly")
-    
-    def test_cross_platform_data_format_consistency(self):
-        """Test that data formats are consistent across all platforms"""
-        # Define the expected threat structure that should be consistent
-        expected_threat_fields = [
-            'id', 'source_ip', 'target_ip', 'threat_type', 'threat_level',
-            'timestamp', 'credibility_score', 'consensus_verified', 'context'
-        ]
-        
-        # Simulate threat from protocol
-        protocol_threat = {
-            'id': 'threat-123',
-            'source_ip': '192.168.1.100',
-            'target_ip': '10.0.0.1',
-            'threat_type': 'Malware',
-            'threat_level': 'Critical',
-            'timestamp': '2023-01-01T00:00:00Z',
-            'credibility_score': 0.85,
-            'consensus_verified': True,
-            'context': 'Test threat'
-        }
-        
-        # Validate protocol threat
-        for field in expected_threat_fields:
-            self.assertIn(field, protocol_threat)
-        
-        # Simulate threat as it would appear in Splunk
-        splunk_threat = {
-            'ID': 'threat-123',
-            'SourceIP': '192.168.1.100', 
-            'TargetIP': '10.0.0.1',
-            'ThreatType': 'Malware',
-            'ThreatLevel': 'Critical',
-            'Timestamp': '2023-01-01T00:00:00Z',
-            'CredibilityScore': 0.85,
-            'ConsensusVerified': True,
-            'Context': 'Test threat'
-        }
-        
-        # Map Splunk fields back to protocol fields to verify consistency
-        splunk_to_protocol_mapping = {
-            'ID': 'id',
-            'SourceIP': 'source_ip',
-            'TargetIP': 'target_ip',
-            'ThreatType': 'threat_type',
-            'ThreatLevel': 'threat_level',
-            'Timestamp': 'timestamp',
-            'CredibilityScore': 'credibility_score',
-            'ConsensusVerified': 'consensus_verified',
-            'Context': 'context'
-        }
-        
-        # Verify mapping is complete
-        for splunk_field, protocol_field in splunk_to_protocol_mapping.items():
-            self.assertIn(splunk_field, splunk_threat)
-            self.assertIn(protocol_field, expected_threat_fields)
-        
-        # Simulate threat as it would appear in XSOAR
-        xsoar_threat = {
-            'ID': 'threat-123',
-            'ThreatType': 'Malware',
-            'ThreatLevel': 'Critical',
-            'SourceIP': '192.168.1.100',
-            'TargetIP': '10.0.0.1',
-            'CredibilityScore': 0.85,
-            'ConsensusVerified': True,
-            'Context': 'Test threat'
-        }
-        
-        # Verify XSOAR fields map correctly
-        for splunk_field, protocol_field in splunk_to_protocol_mapping.items():
-            if splunk_field in ['Timestamp']:  # Some fields might be optional in XSOAR
-                continue
-            self.assertIn(splunk_field, xsoar_threat)
-        
-        print("✓ Data formats are consistent across platforms")
-    
-    def test_upstream_threat_flow(self):
-        """Test the complete flow from upstream source to platform action"""
-        # Simulate CISA AIS threat (upstream)
-        upstream_threat = {
-            'id': 'cisa-ais-123',
-            'source_ip': '203.0.113.10',
-            'threat_type': 'Malware',
-            'threat_level': 'Critical',
-            'confidence': 0.95,  # CISA AIS confidence
-            'description': 'Malware IP from CISA AIS feed',
-            'source': 'cisa_ais'
-        }
-        
-        # Simulate protocol processing
-        processed_threat = {
-            'id': upstream_threat['id'],
-            'source_ip': upstream_threat['source_ip'],
-            'target_ip': 'global',  # Default for upstream threats
-            'threat_type': upstream_threat['threat_type'],
-            'threat_level': upstream_threat['threat_level'],
-            'timestamp': str(datetime.utcnow().isoformat()),
-            'credibility_score': upstream_threat['confidence'],  # Use upstream confidence as initial score
-            'consensus_verified': True,  # Upstream sources are typically trusted
-            'context': f"Upstream source: {upstream_threat['source']} - {upstream_threat['description']}",
-            'evidence_hash': 'mock_hash',
-            'geolocation': 'unknown',
-            'network_flow': 'upstream_feed',
-            'agent_id': f"upstream-{upstream_threat['source']}",
-            'compliance_tag': 'upstream',
-            'region': 'global'
-        }
-        
-        # Verify all required fields are present
-        required_fields = [
-            'id', 'source_ip', 'target_ip', 'threat_type', 'threat_level',
-            'timestamp', 'credibility_score', 'consensus_verified', 'context'
-        ]
-        
-        for field in required_fields:
-            self.assertIn(field, processed_threat)
-        
-        # Simulate action in pfSense (blocking the IP)
-        pfsense_blocked = processed_threat['source_ip']  # IP would be added to blocklist
-        self.assertIsNotNone(pfsense_blocked)
-        
-        # Simulate visibility in Splunk
-        splunk_event = {
-            'index': 'orasrs',
-            'sourcetype': 'orasrs:threat',
-            'threat_id': processed_threat['id'],
-            'source_ip': processed_threat['source_ip'],
-            'threat_type': processed_threat['threat_type'],
-            'threat_level': processed_threat['threat_level'],
-            'credibility_score': processed_threat['credibility_score']
-        }
-        
-        expected_splunk_fields = ['threat_id', 'source_ip', 'threat_type', 'threat_level', 'credibility_score']
-        for field in expected_splunk_fields:
-            self.assertIn(field, splunk_event)
-        
-        print("✓ Upstream threat flows correctly through all platforms")
-    
-    def test_consensus_verification_across_platforms(self):
-        """Test that consensus verification works across all platforms"""
-        # Create a test threat that will go through consensus
-        test_threat = {
-            'id': 'consensus-test-456',
-            'source_ip': '10.0.0.50',
-            'threat_type': 'DDoS',
-            'threat_level': 'Emergency',
-            'credibility_score': 0.6,  # Initial low credibility
-            'consensus_verified': False  # Not yet verified
-        }
-        
-        # Simulate consensus process
-        consensus_result = {
-            'evidence_id': test_threat['id'],
-            'consensus_verdict': True,  # Consensus says it's valid
-            'confidence_score': 0.85,  # High confidence after consensus
-            'consensus_percentage': 0.75,  # 75% of nodes agree
-            'verified_by': ['node1', 'node2', 'node3'],
-            'disputed_by': ['node4']
-        }
-        
-        # After consensus, the threat's credibility should be updated
-        updated_threat = test_threat.copy()
-        updated_threat['consensus_verified'] = consensus_result['consensus_verdict']
-        updated_threat['credibility_score'] = consensus_result['confidence_score']
-        
-        # Verify updated values
-        self.assertTrue(updated_threat['consensus_verified'])
-        self.assertGreater(updated_threat['credibility_score'], 0.8)
-        
-        # In Splunk, this would appear in the consensus verification dashboard
-        splunk_consensus_event = {
-            'index': 'orasrs',
-            'sourcetype': 'orasrs:consensus',
-            'threat_id': consensus_result['evidence_id'],
-            'consensus_status': 'verified' if consensus_result['consensus_verdict'] else 'disputed',
-            'confidence_score': consensus_result['confidence_score'],
-            'consensus_percentage': consensus_result['consensus_percentage']
-        }
-        
-        required_consensus_fields = ['threat_id', 'consensus_status', 'confidence_score', 'consensus_percentage']
-        for field in required_consensus_fields:
-            self.assertIn(field, splunk_consensus_event)
-        
-        # In XSOAR, this would be available through the consensus command
-        xsoar_consensus_output = {
-            'ThreatID': consensus_result['evidence_id'],
-            'ConsensusStatus': 'verified' if consensus_result['consensus_verdict'] else 'disputed',
-            'ConfidenceScore': consensus_result['confidence_score'],
-            'TotalVerifiers': len(consensus_result['verified_by']) + len(consensus_result['disputed_by']),
-            'ConsensusPercentage': consensus_result['consensus_percentage']
-        }
-        
-        expected_xsoar_consensus_fields = ['ThreatID', 'ConsensusStatus', 'ConfidenceScore', 'ConsensusPercentage']
-        for field in expected_xsoar_consensus_fields:
-            self.assertIn(field, xsoar_consensus_output)
-        
-        print("✓ Consensus verification works across all platforms")
-    
-    def test_credential_enhancement_workflow(self):
-        """Test the complete credential enhancement workflow"""
-        # Start with a raw threat detection
-        raw_threat = {
-            'id': 'raw-threat-789',
-            'source_ip': '172.16.0.25',
-            'threat_type': 'SuspiciousConnection',
-            'threat_level': 'Warning',
-            'initial_score': 0.4,  # Low initial confidence
-            'evidence': 'Unusual connection pattern detected'
-        }
-        
-        # Apply upstream correlation (e.g., IP is also in CISA feed)
-        upstream_correlation = {
-            'matched': True,
-            'source': 'cisa_ais',
-            'confidence': 0.9
-        }
-        
-        # Apply consensus verification
-        consensus_data = {
-            'verdict': True,
-            'agreement_count': 4,
-            'total_nodes': 5,
-            'consensus_confidence': 0.8
-        }
-        
-        # Calculate final credibility score
-        # Formula: weighted combination of initial, upstream, and consensus scores
-        if upstream_correlation['matched']:
-            # Upstream correlation significantly boosts credibility
-            final_score = (
-                0.2 * raw_threat['initial_score'] + 
-                0.5 * upstream_correlation['confidence'] + 
-                0.3 * consensus_data['consensus_confidence']
-            )
-        else:
-            # Only consensus affects the score
-            final_score = (
-                0.3 * raw_threat['initial_score'] + 
-                0.7 * consensus_data['consensus_confidence']
-            )
-        
-        # Apply credibility threshold to determine action
-        credibility_threshold = 0.7
-        should_block = final_score >= credibility_threshold
-        
-        # Verify the calculations
-        self.assertGreaterEqual(final_score, 0.0)
-        self.assertLessEqual(final_score, 1.0)
-        
-        # With upstream correlation, the score should be high enough to trigger action
-        self.assertTrue(should_block)
-        self.assertGreater(final_score, 0.7)  # Final score should be above threshold
-        
-        # Enhanced threat for platform distribution
-        enhanced_threat = {
-            **raw_threat,
-            'credibility_score': final_score,
-            'consensus_verified': consensus_data['verdict'],
-            'upstream_correlation': upstream_correlation['matched'],
-            'recommended_action': 'block' if should_block else 'monitor'
-        }
-        
-        # Verify enhanced threat has all required fields
-        required_enhanced_fields = [
-            'credibility_score', 'consensus_verified', 'upstream_correlation', 'recommended_action'
-        ]
-        
-        for field in required_enhanced_fields:
-            self.assertIn(field, enhanced_threat)
-        
-        print("✓ Credential enhancement workflow produces correct results")
-    
-    def test_platform_specific_functionality(self):
-        """Test platform-specific functionality while maintaining integration"""
-        # Splunk-specific: Dashboard and search functionality
-        splunk_features = {
-            'dashboard_exists': True,
-            'search_macros': ['orasrs_threats'],
-            'field_extractions': ['threat_id', 'threat_type', 'credibility_score'],
-            'correlation_rules': ['suspicious_volume', 'geographic_anomaly']
-        }
-        
-        self.assertTrue(splunk_features['dashboard_exists'])
-        self.assertIn('threat_id', splunk_features['field_extractions'])
-        self.assertGreater(len(splunk_features['correlation_rules']), 0)
-        
-        # XSOAR-specific: Playbooks and automation
-        xsoar_features = {
-            'commands': [
-                'orasrs-get-threat-intelligence',
-                'orasrs-get-consensus-verification', 
-                'orasrs-submit-threat-evidence',
-                'orasrs-get-upstream-intelligence'
-            ],
-            'context_paths': [
-                'OraSRS.Threat.ID',
-                'OraSRS.Consensus.ConfidenceScore',
-                'OraSRS.Submission.Status'
-            ]
-        }
-        
-        self.assertEqual(len(xsoar_features['commands']), 4)
-        self.assertIn('orasrs-get-threat-intelligence', xsoar_features['commands'])
-        
-        # pfSense-specific: Firewall integration
-        pfsense_features = {
-            'firewall_table': 'orasrs_blocked',
-            'blocking_enabled': True,
-            'automatic_updates': True,
-            'logging_enabled': True
-        }
-        
-        self.assertEqual(pfsense_features['firewall_table'], 'orasrs_blocked')
-        self.assertTrue(pfsense_features['blocking_enabled'])
-        
-        print("✓ Platform-specific functionality works correctly")
-    
-    def test_error_handling_and_resilience(self):
-        """Test error handling and resilience across the ecosystem"""
-        # Test graceful degradation when upstream sources are unavailable
-        try:
-            # Simulate CISA AIS feed being down
-            upstream_unavailable = True
-            
-            # System should continue operating with other threat sources
-            fallback_sources = ['local_detection', 'community_feeds']
-            self.assertGreater(len(fallback_sources), 0)
-            
-            print("✓ System can handle upstream source unavailability")
-            
-        except Exception as e:
-            self.fail(f"System should handle upstream failures gracefully: {e}")
-        
-        # Test what happens when consensus nodes are unavailable
-        try:
-            # Simulate low consensus participation
-            available_nodes = 2
-            required_for_consensus = 3
-            
-            # System should still function but with reduced confidence
-            degraded_mode = True  # Continue with local analysis only
-            self.assertTrue(degraded_mode)
-            
-            print("✓ System can operate in degraded consensus mode")
-            
-        except Exception as e:
-            self.fail(f"System should handle low consensus participation: {e}")
-        
-        # Test API rate limiting and backoff
-        try:
-            # Simulate rate limiting
-            rate_limited = True
-            
-            # System should implement backoff strategy
-            import time
-            backoff_time = 60  # Wait 60 seconds before retry
-            time.sleep(0.001)  # Mock the wait
-            
-            print("✓ System implements rate limiting backoff")
-            
-        except Exception as e:
-            self.fail(f"System should handle rate limiting: {e}")
-
-
-class TestEcosystemCompatibility(unittest.TestCase):
-    """Test compatibility and interoperability between all components"""
-    
-    def test_version_compatibility(self):
-        """Test version compatibility across the ecosystem"""
-        versions = {
-            'protocol': '2.0.0',
-            'splunk_app': '2.0.0',
-            'xsoar_integration': '2.0.0',
-            'pfsense_plugin': '2.0.0'
-        }
-        
-        # All components should have the same major version
-        major_versions = [v.split('.')[0] for v in versions.values()]
-        self.assertTrue(all(v == '2' for v in major_versions), "All components should be v2.x")
-        
-        print("✓ All components have compatible versions")
-    
-    def test_data_schema_compatibility(self):
-        """Test that data schemas are compatible across platforms"""
-        # Define the canonical threat schema
-        canonical_schema = {
-            'id': 'string',
-            'source_ip': 'string',
-            'target_ip': 'string',
-            'threat_type': 'enum',
-            'threat_level': 'enum',
-            'timestamp': 'datetime',
-            'credibility_score': 'float',
-            'consensus_verified': 'boolean',
-            'context': 'string',
-            'evidence_hash': 'string'
-        }
-        
-        # Verify each platform can handle the canonical schema
-        platforms = {
-            'protocol': list(canonical_schema.keys()),
-            'splunk': ['ID', 'SourceIP', 'TargetIP', 'ThreatType', 'ThreatLevel', 'CredibilityScore', 'ConsensusVerified', 'Context'],
-            'xsoar': ['ID', 'ThreatType', 'ThreatLevel', 'SourceIP', 'CredibilityScore', 'ConsensusVerified'],
-            'pfsense': ['source_ip', 'credibility_score', 'threat_type']
-        }
-        
-        # Check that each platform handles a subset of the canonical schema
-        for platform, fields in platforms.items():
-            for field in fields:
-                # Convert platform field names to canonical names for comparison
-                canonical_field = field.lower().replace('ip', '_ip').replace('id', '_id') if '_' not in field else field
-                if canonical_field in ['id', 'source_ip', 'threat_type', 'credibility_score']:
-                    # These are essential fields that should be present
-                    canonical_match = any(cf.replace('_', '') == canonical_field.replace('_', '') or 
-                                        canonical_field.replace('_', '') == cf.replace('_', '') 
-                                        for cf in canonical_schema.keys())
-                    self.assertTrue(canonical_match, f"Platform {platform} field {field} should match canonical schema")
-        
-        print("✓ Data schemas are compatible across platforms")
-    
-    def test_api_contract_compatibility(self):
-        """Test that API contracts are compatible across components"""
-        # Define the expected API endpoints
-        expected_endpoints = [
-            '/api/v2.0/threats',
-            '/api/v2.0/threats/{threat_id}/consensus',
-            '/api/v2.0/threats/upstream',
-            '/api/v2.0/threats',  # POST for submission
-            '/api/v2.0/health'
+# Platform test modules run alongside this one (skip XSOAR due to dependency
+# issues in test environment). pytest collects them directly, so they are
+# not imported here.
+_PLATFORM_TEST_MODULES = ('splunk_app_tests.py', 'pfsense_plugin_tests.py')
+
+
+# Pre-built protocol component mocks. MagicMock construction is expensive, so
+# the templates are wired once at import and each test receives a shallow
+# copy. Child mocks are shared between copies, so tests must not assert on
+# call counts of these components.
+_AGG_TEMPLATE = MagicMock()
+_AGG_TEMPLATE.get_sources_config.return_value = [
+    {'name': 'CISA_AIS', 'enabled': True}
+]
+_AGG_TEMPLATE.fetch_all_sources.return_value = [
+    {
+        'id': 'test-threat-1',
+        'source_ip': '192.168.1.100',
+        'credibility_score': 0.85,
+        'consensus_verified': True
+    }
+]
+
+_CONS_TEMPLATE = MagicMock()
+_CONS_TEMPLATE.check_consensus.return_value = {
+    'evidence_id': 'test-threat-1',
+    'consensus_verdict': True,
+    'confidence_score': 0.9,
+    'consensus_percentage': 0.8
+}
+
+_CRED_TEMPLATE = MagicMock()
+_CRED_TEMPLATE.calculate_credibility_score.return_value = 0.88
+_CRED_TEMPLATE.enhance_threat_evidence = lambda ev, conf: ev
+
+
+# Fixed event time keeps the test payloads deterministic
+_FIXED_TS = "2023-01-01T00:00:00Z"
+
+# Canonical threat structure shared by every platform
+EXPECTED_THREAT_FIELDS = frozenset((
+    'id', 'source_ip', 'target_ip', 'threat_type', 'threat_level',
+    'timestamp', 'credibility_score', 'consensus_verified', 'context'
+))
+
+# Splunk fields and the protocol fields they map back to, position by position
+_SPLUNK_KEYS = (
+    'ID', 'SourceIP', 'TargetIP', 'ThreatType', 'ThreatLevel',
+    'Timestamp', 'CredibilityScore', 'ConsensusVerified', 'Context'
+)
+_PROTO_KEYS = (
+    'id', 'source_ip', 'target_ip', 'threat_type', 'threat_level',
+    'timestamp', 'credibility_score', 'consensus_verified', 'context'
+)
+
+# Splunk fields that XSOAR context entries may omit
+_XSOAR_OPTIONAL = frozenset({'Timestamp'})
+
+EXPECTED_SPLUNK_FIELDS = frozenset(_SPLUNK_KEYS)
+EXPECTED_XSOAR_FIELDS = EXPECTED_SPLUNK_FIELDS - _XSOAR_OPTIONAL
+
+# The same threat as it appears in the protocol, Splunk and XSOAR
+PROTOCOL_THREAT = MappingProxyType({
+    'id': 'threat-123',
+    'source_ip': '192.168.1.100',
+    'target_ip': '10.0.0.1',
+    'threat_type': 'Malware',
+    'threat_level': 'Critical',
+    'timestamp': _FIXED_TS,
+    'credibility_score': 0.85,
+    'consensus_verified': True,
+    'context': 'Test threat'
+})
+
+SPLUNK_THREAT = MappingProxyType({
+    'ID': 'threat-123',
+    'SourceIP': '192.168.1.100',
+    'TargetIP': '10.0.0.1',
+    'ThreatType': 'Malware',
+    'ThreatLevel': 'Critical',
+    'Timestamp': _FIXED_TS,
+    'CredibilityScore': 0.85,
+    'ConsensusVerified': True,
+    'Context': 'Test threat'
+})
+
+XSOAR_THREAT = MappingProxyType({
+    'ID': 'threat-123',
+    'ThreatType': 'Malware',
+    'ThreatLevel': 'Critical',
+    'SourceIP': '192.168.1.100',
+    'TargetIP': '10.0.0.1',
+    'CredibilityScore': 0.85,
+    'ConsensusVerified': True,
+    'Context': 'Test threat'
+})
+
+# Canonical threat schema
+CANONICAL_SCHEMA = MappingProxyType({
+    'id': 'string',
+    'source_ip': 'string',
+    'target_ip': 'string',
+    'threat_type': 'enum',
+    'threat_level': 'enum',
+    'timestamp': 'datetime',
+    'credibility_score': 'float',
+    'consensus_verified': 'boolean',
+    'context': 'string',
+    'evidence_hash': 'string'
+})
+
+
+def compute_credibility(initial: float, upstream: float, consensus: float, matched: bool) -> float:
+    """Weighted combination of initial, upstream, and consensus scores"""
+    if matched:
+        # Upstream correlation significantly boosts credibility
+        return 0.2 * initial + 0.5 * upstream + 0.3 * consensus
+    # Only consensus affects the score
+    return 0.3 * initial + 0.7 * consensus
+
+
+# ---------------------------------------------------------------------------
+# Shared fixtures
+# ---------------------------------------------------------------------------
+
+@pytest.fixture(scope="module")
+def consensus_result():
+    """Consensus outcome for a threat that passed verification"""
+    return {
+        'evidence_id': 'consensus-test-456',
+        'consensus_verdict': True,  # Consensus says it's valid
+        'confidence_score': 0.85,  # High confidence after consensus
+        'consensus_percentage': 0.75,  # 75% of nodes agree
+        'verified_by': ['node1', 'node2', 'node3'],
+        'disputed_by': ['node4']
+    }
+
+
+@pytest.fixture
+def mock_aggregator():
+    """Threat intel aggregator mock with upstream sources wired"""
+    return copy.copy(_AGG_TEMPLATE)
+
+
+@pytest.fixture
+def mock_consensus_engine():
+    """Consensus engine mock returning a positive verdict"""
+    return copy.copy(_CONS_TEMPLATE)
+
+
+@pytest.fixture
+def mock_credibility_engine():
+    """Credibility engine mock returning a fixed score"""
+    return copy.copy(_CRED_TEMPLATE)
+
+
+# ---------------------------------------------------------------------------
+# Comprehensive integration tests for OraSRS v2.0 ecosystem
+# ---------------------------------------------------------------------------
+
+def test_protocol_component_interactions(mock_aggregator, mock_consensus_engine, mock_credibility_engine):
+    """Test that protocol components work together correctly"""
+    # This test verifies that the core protocol components can interact
+    # Testing the flow: Threat detection -> Consensus -> Credibility -> Action
+
+    # Simulate the interaction flow
+    threat_data = mock_aggregator.fetch_all_sources()
+    assert threat_data is not None
+    assert len(threat_data) > 0
+
+    # Process through consensus
+    consensus_result = mock_consensus_engine.check_consensus('test-request-id')
+    assert consensus_result is not None
+    assert consensus_result['consensus_verdict']
+
+    # Apply credibility
+    credibility_score = mock_credibility_engine.calculate_credibility_score({}, 0.9)
+    assert 0.0 <= credibility_score <= 1.0
+
+    print("✓ Protocol components can interact correctly")
+
+
+@pytest.mark.parametrize("payload,expected", [
+    (PROTOCOL_THREAT, EXPECTED_THREAT_FIELDS),
+    (SPLUNK_THREAT, EXPECTED_SPLUNK_FIELDS),
+    (XSOAR_THREAT, EXPECTED_XSOAR_FIELDS),
+], ids=['protocol', 'splunk', 'xsoar'])
+def test_platform_has_required_fields(payload, expected):
+    """Test that each platform's threat representation carries its required fields"""
+    missing = expected - payload.keys()
+    assert not missing, missing
+
+
+def test_cross_platform_data_format_consistency():
+    """Test that data formats are consistent across all platforms"""
+    # Map Splunk fields back to protocol fields and check that every
+    # platform carries the same value for each of them
+    for sk, pk in zip(_SPLUNK_KEYS, _PROTO_KEYS):
+        assert pk in EXPECTED_THREAT_FIELDS
+        assert SPLUNK_THREAT[sk] == PROTOCOL_THREAT[pk]
+        if sk in _XSOAR_OPTIONAL:
+            continue
+        assert XSOAR_THREAT[sk] == SPLUNK_THREAT[sk]
+
+    # XSOAR context entries must survive serialization unchanged
+    assert _loads(_dumps(dict(XSOAR_THREAT))) == XSOAR_THREAT
+
+    print("✓ Data formats are consistent across platforms")
+
+
+def test_upstream_threat_flow():
+    """Test the complete flow from upstream source to platform action"""
+    # Simulate CISA AIS threat (upstream)
+    upstream_threat = {
+        'id': 'cisa-ais-123',
+        'source_ip': '203.0.113.10',
+        'threat_type': 'Malware',
+        'threat_level': 'Critical',
+        'confidence': 0.95,  # CISA AIS confidence
+        'description': 'Malware IP from CISA AIS feed',
+        'source': 'cisa_ais'
+    }
+
+    # Simulate protocol processing
+    processed_threat = {
+        'id': upstream_threat['id'],
+        'source_ip': upstream_threat['source_ip'],
+        'target_ip': 'global',  # Default for upstream threats
+        'threat_type': upstream_threat['threat_type'],
+        'threat_level': upstream_threat['threat_level'],
+        'timestamp': _FIXED_TS,
+        'credibility_score': upstream_threat['confidence'],  # Use upstream confidence as initial score
+        'consensus_verified': True,  # Upstream sources are typically trusted
+        'context': f"Upstream source: {upstream_threat['source']} - {upstream_threat['description']}",
+        'evidence_hash': 'mock_hash',
+        'geolocation': 'unknown',
+        'network_flow': 'upstream_feed',
+        'agent_id': f"upstream-{upstream_threat['source']}",
+        'compliance_tag': 'upstream',
+        'region': 'global'
+    }
+
+    # Verify all required fields are present
+    missing = EXPECTED_THREAT_FIELDS - processed_threat.keys()
+    assert not missing, missing
+
+    # Simulate action in pfSense (blocking the IP)
+    pfsense_blocked = processed_threat['source_ip']  # IP would be added to blocklist
+    assert pfsense_blocked is not None
+
+    # Simulate visibility in Splunk
+    splunk_event = {
+        'index': 'orasrs',
+        'sourcetype': 'orasrs:threat',
+        'threat_id': processed_threat['id'],
+        'source_ip': processed_threat['source_ip'],
+        'threat_type': processed_threat['threat_type'],
+        'threat_level': processed_threat['threat_level'],
+        'credibility_score': processed_threat['credibility_score']
+    }
+
+    expected_splunk_fields = ['threat_id', 'source_ip', 'threat_type', 'threat_level', 'credibility_score']
+    missing = set(expected_splunk_fields) - splunk_event.keys()
+    assert not missing, missing
+
+    # The event must survive serialization to the Splunk HEC payload
+    assert _loads(_dumps(splunk_event)) == splunk_event
+
+    print("✓ Upstream threat flows correctly through all platforms")
+
+
+def test_consensus_verification_across_platforms(consensus_result):
+    """Test that consensus verification works across all platforms"""
+    # Create a test threat that will go through consensus
+    test_threat = {
+        'id': consensus_result['evidence_id'],
+        'source_ip': '10.0.0.50',
+        'threat_type': 'DDoS',
+        'threat_level': 'Emergency',
+        'credibility_score': 0.6,  # Initial low credibility
+        'consensus_verified': False  # Not yet verified
+    }
+
+    # After consensus, the threat's credibility should be updated
+    updated_threat = test_threat.copy()
+    updated_threat['consensus_verified'] = consensus_result['consensus_verdict']
+    updated_threat['credibility_score'] = consensus_result['confidence_score']
+
+    # Verify updated values
+    assert updated_threat['consensus_verified']
+    assert 0.8 < updated_threat['credibility_score'] <= 1.0
+
+    # In Splunk, this would appear in the consensus verification dashboard
+    splunk_consensus_event = {
+        'index': 'orasrs',
+        'sourcetype': 'orasrs:consensus',
+        'threat_id': consensus_result['evidence_id'],
+        'consensus_status': 'verified' if consensus_result['consensus_verdict'] else 'disputed',
+        'confidence_score': consensus_result['confidence_score'],
+        'consensus_percentage': consensus_result['consensus_percentage']
+    }
+
+    required_consensus_fields = ['threat_id', 'consensus_status', 'confidence_score', 'consensus_percentage']
+    missing = set(required_consensus_fields) - splunk_consensus_event.keys()
+    assert not missing, missing
+
+    # In XSOAR, this would be available through the consensus command
+    xsoar_consensus_output = {
+        'ThreatID': consensus_result['evidence_id'],
+        'ConsensusStatus': 'verified' if consensus_result['consensus_verdict'] else 'disputed',
+        'ConfidenceScore': consensus_result['confidence_score'],
+        'TotalVerifiers': len(consensus_result['verified_by']) + len(consensus_result['disputed_by']),
+        'ConsensusPercentage': consensus_result['consensus_percentage']
+    }
+
+    expected_xsoar_consensus_fields = ['ThreatID', 'ConsensusStatus', 'ConfidenceScore', 'ConsensusPercentage']
+    missing = set(expected_xsoar_consensus_fields) - xsoar_consensus_output.keys()
+    assert not missing, missing
+
+    print("✓ Consensus verification works across all platforms")
+
+
+def test_credential_enhancement_workflow():
+    """Test the complete credential enhancement workflow"""
+    # Start with a raw threat detection
+    raw_threat = {
+        'id': 'raw-threat-789',
+        'source_ip': '172.16.0.25',
+        'threat_type': 'SuspiciousConnection',
+        'threat_level': 'Warning',
+        'initial_score': 0.4,  # Low initial confidence
+        'evidence': 'Unusual connection pattern detected'
+    }
+
+    # Apply upstream correlation (e.g., IP is also in CISA feed)
+    upstream_correlation = {
+        'matched': True,
+        'source': 'cisa_ais',
+        'confidence': 0.9
+    }
+
+    # Apply consensus verification
+    consensus_data = {
+        'verdict': True,
+        'agreement_count': 4,
+        'total_nodes': 5,
+        'consensus_confidence': 0.8
+    }
+
+    # Calculate final credibility score
+    final_score = compute_credibility(
+        raw_threat['initial_score'],
+        upstream_correlation['confidence'],
+        consensus_data['consensus_confidence'],
+        upstream_correlation['matched']
+    )
+
+    # Apply credibility threshold to determine action
+    credibility_threshold = 0.7
+    should_block = final_score >= credibility_threshold
+
+    # Verify the calculations
+    assert 0.0 <= final_score <= 1.0
+
+    # With upstream correlation, the score should be high enough to trigger action
+    assert should_block
+    assert final_score > 0.7  # Final score should be above threshold
+
+    # Without upstream correlation, only consensus lifts the initial score
+    uncorrelated_score = compute_credibility(
+        raw_threat['initial_score'],
+        upstream_correlation['confidence'],
+        consensus_data['consensus_confidence'],
+        False
+    )
+    assert uncorrelated_score == pytest.approx(0.68)
+    assert uncorrelated_score < final_score
+
+    # Enhanced threat for platform distribution
+    enhanced_threat = {
+        **raw_threat,
+        'credibility_score': final_score,
+        'consensus_verified': consensus_data['verdict'],
+        'upstream_correlation': upstream_correlation['matched'],
+        'recommended_action': 'block' if should_block else 'monitor'
+    }
+
+    # Verify enhanced threat has all required fields
+    required_enhanced_fields = [
+        'credibility_score', 'consensus_verified', 'upstream_correlation', 'recommended_action'
+    ]
+
+    missing = set(required_enhanced_fields) - enhanced_threat.keys()
+    assert not missing, missing
+
+    print("✓ Credential enhancement workflow produces correct results")
+
+
+def test_platform_specific_functionality():
+    """Test platform-specific functionality while maintaining integration"""
+    # Splunk-specific: Dashboard and search functionality
+    splunk_features = {
+        'dashboard_exists': True,
+        'search_macros': ['orasrs_threats'],
+        'field_extractions': ['threat_id', 'threat_type', 'credibility_score'],
+        'correlation_rules': ['suspicious_volume', 'geographic_anomaly']
+    }
+
+    assert splunk_features['dashboard_exists']
+    assert 'threat_id' in splunk_features['field_extractions']
+    assert len(splunk_features['correlation_rules']) > 0
+
+    # XSOAR-specific: Playbooks and automation
+    xsoar_features = {
+        'commands': [
+            'orasrs-get-threat-intelligence',
+            'orasrs-get-consensus-verification',
+            'orasrs-submit-threat-evidence',
+            'orasrs-get-upstream-intelligence'
+        ],
+        'context_paths': [
+            'OraSRS.Threat.ID',
+            'OraSRS.Consensus.ConfidenceScore',
+            'OraSRS.Submission.Status'
         ]
-        
-        # Verify all components work with these endpoints
-        for endpoint in expected_endpoints:
-            # All endpoints should follow the same pattern
-            self.assertTrue(endpoint.startswith('/api/v2.0/'), f"Endpoint {endpoint} should follow v2.0 API pattern")
-        
-        print("✓ API contracts are compatible across components")
+    }
+
+    assert len(xsoar_features['commands']) == 4
+    assert 'orasrs-get-threat-intelligence' in xsoar_features['commands']
+
+    # pfSense-specific: Firewall integration
+    pfsense_features = {
+        'firewall_table': 'orasrs_blocked',
+        'blocking_enabled': True,
+        'automatic_updates': True,
+        'logging_enabled': True
+    }
+
+    assert pfsense_features['firewall_table'] == 'orasrs_blocked'
+    assert pfsense_features['blocking_enabled']
+
+    print("✓ Platform-specific functionality works correctly")
+
+
+def test_error_handling_and_resilience():
+    """Test error handling and resilience across the ecosystem"""
+    # Test graceful degradation when upstream sources are unavailable
+    try:
+        # Simulate CISA AIS feed being down
+        upstream_unavailable = True
+
+        # System should continue operating with other threat sources
+        fallback_sources = ['local_detection', 'community_feeds']
+        assert len(fallback_sources) > 0
+
+        print("✓ System can handle upstream source unavailability")
+
+    except Exception as e:
+        pytest.fail(f"System should handle upstream failures gracefully: {e}")
+
+    # Test what happens when consensus nodes are unavailable
+    try:
+        # Simulate low consensus participation
+        available_nodes = 2
+        required_for_consensus = 3
+
+        # System should still function but with reduced confidence
+        degraded_mode = True  # Continue with local analysis only
+        assert degraded_mode
+
+        print("✓ System can operate in degraded consensus mode")
+
+    except Exception as e:
+        pytest.fail(f"System should handle low consensus participation: {e}")
+
+    # Test API rate limiting and backoff
+    try:
+        # Simulate rate limiting
+        rate_limited = True
+
+        # System should implement backoff strategy
+        backoff_time = 60  # Wait 60 seconds before retry
+        assert backoff_time > 0
+
+        print("✓ System implements rate limiting backoff")
+
+    except Exception as e:
+        pytest.fail(f"System should handle rate limiting: {e}")
+
+
+# ---------------------------------------------------------------------------
+# Compatibility and interoperability between all components
+# ---------------------------------------------------------------------------
+
+def test_version_compatibility():
+    """Test version compatibility across the ecosystem"""
+    versions = {
+        'protocol': '2.0.0',
+        'splunk_app': '2.0.0',
+        'xsoar_integration': '2.0.0',
+        'pfsense_plugin': '2.0.0'
+    }
+
+    # All components should have the same major version
+    major_versions = [v.split('.')[0] for v in versions.values()]
+    assert all(v == '2' for v in major_versions), "All components should be v2.x"
+
+    print("✓ All components have compatible versions")
+
+
+def test_data_schema_compatibility():
+    """Test that data schemas are compatible across platforms"""
+    # Verify each platform can handle the canonical schema
+    platforms = {
+        'protocol': list(CANONICAL_SCHEMA.keys()),
+        'splunk': ['ID', 'SourceIP', 'TargetIP', 'ThreatType', 'ThreatLevel', 'CredibilityScore', 'ConsensusVerified', 'Context'],
+        'xsoar': ['ID', 'ThreatType', 'ThreatLevel', 'SourceIP', 'CredibilityScore', 'ConsensusVerified'],
+        'pfsense': ['source_ip', 'credibility_score', 'threat_type']
+    }
+
+    # Check that each platform handles a subset of the canonical schema
+    for platform, fields in platforms.items():
+        for field in fields:
+            # Convert platform field names to canonical names for comparison
+            canonical_field = field.lower().replace('ip', '_ip').replace('id', '_id') if '_' not in field else field
+            if canonical_field in ['id', 'source_ip', 'threat_type', 'credibility_score']:
+                # These are essential fields that should be present
+                canonical_match = any(cf.replace('_', '') == canonical_field.replace('_', '') or
+                                      canonical_field.replace('_', '') == cf.replace('_', '')
+                                      for cf in CANONICAL_SCHEMA.keys())
+                assert canonical_match, f"Platform {platform} field {field} should match canonical schema"
+
+    print("✓ Data schemas are compatible across platforms")
+
+
+def test_api_contract_compatibility():
+    """Test that API contracts are compatible across components"""
+    # Define the expected API endpoints
+    expected_endpoints = [
+        '/api/v2.0/threats',
+        '/api/v2.0/threats/{threat_id}/consensus',
+        '/api/v2.0/threats/upstream',
+        '/api/v2.0/threats',  # POST for submission
+        '/api/v2.0/health'
+    ]
+
+    # Verify all components work with these endpoints
+    for endpoint in expected_endpoints:
+        # All endpoints should follow the same pattern
+        assert endpoint.startswith('/api/v2.0/'), f"Endpoint {endpoint} should follow v2.0 API pattern"
+
+    print("✓ API contracts are compatible across components")
 
 
 def run_comprehensive_tests():
-    """Run all integration tests and return results"""
-    print("="*60)
-    print("RUNNING COMPREHENSIVE ORASRS V2.0 INTEGRATION TESTS")
-    print("="*60)
-    
-    # Create a test suite
-    suite = unittest.TestSuite()
-    
-    # Add all test cases
-    suite.addTest(unittest.makeSuite(TestOraSRSIntegration))
-    suite.addTest(unittest.makeSuite(TestEcosystemCompatibility))
-    
-    # Run the tests
-    runner = unittest.TextTestRunner(verbosity=2)
-    result = runner.run(suite)
-    
-    print("\n" + "="*60)
-    print("INTEGRATION TEST RESULTS")
-    print("="*60)
-    print(f"Tests run: {result.testsRun}")
-    print(f"Failures: {len(result.failures)}")
-    print(f"Errors: {len(result.errors)}")
-    
-    if result.failures:
-        print("\nFailures:")
-        for test, trace in result.failures:
-            print(f"  {test}: {trace}")
-    
-    if result.errors:
-        print("\nErrors:")
-        for test, trace in result.errors:
-            print(f"  {test}: {trace}")
-    
-    if result.failures or result.errors:
-        print("\n❌ Some tests failed!")
-        return False
-    else:
-        print("\n✅ All integration tests passed!")
-        return True
+    """Run all integration tests, including the platform test modules, and return results
+
+    Tests are distributed across all cores with pytest-xdist when it is
+    installed (pip install pytest-xdist); otherwise they run serially.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    args = [__file__, *(os.path.join(here, m) for m in _PLATFORM_TEST_MODULES), "-q"]
+    if importlib.util.find_spec("xdist") is not None:
+        args += ["-n", "auto"]
+    return pytest.main(args) == 0
 
 
 if __name__ == '__main__':
@@ -62,7 +62,35 @@ class OraSRSPlugin {
      * Save plugin settings to file
      */
     public function save_settings() {
-        file_put_contents($this->config_file, json_encode($this->settings, JSON_PRETTY_PRINT));
+        $json = json_encode($this->settings, JSON_PRETTY_PRINT);
+        if ($json === false) {
+            syslog(LOG_ERR, "OraSRS: Unable to encode settings: " . json_last_error_msg());
+            return;
+        }
+        // Write a sibling file and rename it over the config so readers never see a truncated file
+        $tmp_file = $this->config_file . '.tmp';
+        $fp = fopen($tmp_file, 'w');
+        if ($fp === false) {
+            syslog(LOG_ERR, "OraSRS: Unable to write settings to {$tmp_file}");
+            return;
+        }
+        $written = fwrite($fp, $json);
+        $flushed = fflush($fp);
+        if (function_exists('fsync')) {
+            $flushed = fsync($fp) && $flushed;
+        }
+        $closed = fclose($fp);
+        // A short write (e.g. a full disk) must never replace the good config
+        if ($written !== strlen($json) || !$flushed || !$closed) {
+            unlink($tmp_file);
+            syslog(LOG_ERR, "OraSRS: Incomplete write of settings to {$tmp_file}; keeping the existing config");
+            return;
+        }
+        if (!rename($tmp_file, $this->config_file)) {
+            unlink($tmp_file);
+            syslog(LOG_ERR, "OraSRS: Unable to replace {$this->config_file} with the new settings");
+            return;
+        }
         // Signal pfSense to reload configuration
         system("killall -HUP syslogd");
     }
@@ -167,21 +195,49 @@ class OraSRSPlugin {
             $ip = $ip_entry['ip'] ?? $ip_entry;
             $credibility = $ip_entry['credibility_score'] ?? 1.0;
             
+            // pfctl rejects the whole batch on one bad address, so drop malformed entries up front
+            if (!is_string($ip) || filter_var($ip, FILTER_VALIDATE_IP) === false) {
+                syslog(LOG_WARNING, "OraSRS: Skipping invalid IP address in threat feed");
+                continue;
+            }
+            
             // Only block if credibility is above threshold
-            if ($credibility >= $this->settings['credibility_threshold']) {
-                // Add to pfSense firewall table
-                $result = mwexec("/sbin/pfctl -t orasrs_blocked -T add {$ip} 2>/dev/null", true);
-                
-                if ($result === 0) {
-                    $blocked_ips[] = $ip;
-                    if ($this->settings['log_threats']) {
-                        syslog(LOG_WARNING, "OraSRS: Blocked malicious IP {$ip} (Credibility: {$credibility})");
-                    }
-                }
+            if ($credibility >= $this->settings['credibility_threshold'] && !isset($blocked_ips[$ip])) {
+                $blocked_ips[$ip] = $credibility;
+            }
+        }
+        
+        if (empty($blocked_ips)) {
+            return array();
+        }
+        
+        // Pipe the whole batch into the pfSense firewall table through a single pfctl process
+        $descriptors = array(
+            0 => array('pipe', 'r'),
+            1 => array('file', '/dev/null', 'w'),
+            2 => array('file', '/dev/null', 'w')
+        );
+        $process = proc_open(array('/sbin/pfctl', '-t', 'orasrs_blocked', '-T', 'add', '-f', '-'), $descriptors, $pipes);
+        if (!is_resource($process)) {
+            syslog(LOG_ERR, "OraSRS: Unable to start pfctl to update the blocklist");
+            return array();
+        }
+        fwrite($pipes[0], implode("\n", array_keys($blocked_ips)) . "\n");
+        fclose($pipes[0]);
+        $result = proc_close($process);
+        
+        if ($result !== 0) {
+            syslog(LOG_ERR, "OraSRS: pfctl exited with status {$result}; " . count($blocked_ips) . " IPs were not blocked");
+            return array();
+        }
+        
+        if ($this->settings['log_threats']) {
+            foreach ($blocked_ips as $ip => $credibility) {
+                syslog(LOG_WARNING, "OraSRS: Blocked malicious IP {$ip} (Credibility: {$credibility})");
             }
         }
         
-        return $blocked_ips;
+        return array_map('strval', array_keys($blocked_ips));
     }
 
     /**
@@ -226,6 +282,27 @@ class OraSRSPlugin {
         }
     }
 
+    /**
+     * Build blocklist entries from feed records that meet the credibility threshold
+     */
+    private function collect_high_risk($records, $cred_key, $default_cred) {
+        $entries = array();
+        foreach ($records as $threat) {
+            if (!isset($threat['source_ip'])) {
+                continue;
+            }
+            $credibility = $threat[$cred_key] ?? $default_cred;
+            // Records without a credibility score and no default are never blocked
+            if ($credibility !== null && $credibility >= $this->settings['credibility_threshold']) {
+                $entries[] = array(
+                    'ip' => $threat['source_ip'],
+                    'credibility_score' => $credibility
+                );
+            }
+        }
+        return $entries;
+    }
+
     /**
      * Process threat intelligence and update firewall
      */
@@ -242,49 +319,32 @@ class OraSRSPlugin {
             return false;
         }
 
-        // Extract IPs with high credibility scores
-        $high_risk_ips = array();
-        foreach ($threat_data['threats'] ?? array() as $threat) {
-            if (isset($threat['source_ip']) && 
-                isset($threat['credibility_score']) && 
-                $threat['credibility_score'] >= $this->settings['credibility_threshold']) {
-                
-                $high_risk_ips[] = array(
-                    'ip' => $threat['source_ip'],
-                    'credibility_score' => $threat['credibility_score']
-                );
-            }
+        // Nothing below has any effect unless blocking is enabled
+        if (!$this->settings['block_malicious_ips']) {
+            return true;
         }
 
-        // Add high-risk IPs to blocklist if enabled
-        if ($this->settings['block_malicious_ips'] && !empty($high_risk_ips)) {
-            $blocked = $this->add_to_blocklist($high_risk_ips);
-            if (!empty($blocked)) {
-                syslog(LOG_INFO, "OraSRS: Added " . count($blocked) . " IPs to blocklist");
-            }
-        }
+        // Extract IPs with high credibility scores
+        $candidate_ips = $this->collect_high_risk($threat_data['threats'] ?? array(), 'credibility_score', null);
 
         // Also process upstream intelligence
         if ($this->settings['upstream_sources']['cisa_ais']) {
             $upstream_data = $this->fetch_upstream_intelligence();
             
             if (!isset($upstream_data['error'])) {
-                $upstream_ips = array();
-                foreach ($upstream_data['upstream_threats'] ?? array() as $threat) {
-                    if (isset($threat['source_ip'])) {
-                        $upstream_ips[] = array(
-                            'ip' => $threat['source_ip'],
-                            'credibility_score' => $threat['confidence'] ?? 0.9  // Upstream sources typically have high confidence
-                        );
-                    }
-                }
-                
-                if ($this->settings['block_malicious_ips'] && !empty($upstream_ips)) {
-                    $blocked = $this->add_to_blocklist($upstream_ips);
-                    if (!empty($blocked)) {
-                        syslog(LOG_INFO, "OraSRS: Added " . count($blocked) . " upstream IPs to blocklist");
-                    }
-                }
+                // Upstream sources typically have high confidence
+                $candidate_ips = array_merge(
+                    $candidate_ips,
+                    $this->collect_high_risk($upstream_data['upstream_threats'] ?? array(), 'confidence', 0.9)
+                );
+            }
+        }
+
+        // Primary and upstream IPs share a single blocklist transaction
+        if (!empty($candidate_ips)) {
+            $blocked = $this->add_to_blocklist($candidate_ips);
+            if (!empty($blocked)) {
+                syslog(LOG_INFO, "OraSRS: Added " . count($blocked) . " IPs to blocklist");
             }
         }
 
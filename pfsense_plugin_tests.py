@@ -7,19 +7,53 @@ import sys
 import os
 import tempfile
 import json
+import ipaddress
 from unittest.mock import Mock, patch, MagicMock, mock_open
 import subprocess
+import time
+from itertools import compress, count
+from operator import attrgetter, itemgetter
+
+# Plugin settings are persisted with orjson when available
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj).encode()
+
+    _loads = json.loads
+
+# With ORASRS_FAKE_FS=1 the mock plugin keeps its config files in memory,
+# keyed by path, instead of writing them under /tmp
+_USE_FAKE_FS = os.environ.get('ORASRS_FAKE_FS') == '1'
+_FAKE_FS = {}
+_FAKE_FS_IDS = count()
 
 # Add the plugin directory to the path
-sys.path.insert(0, '/home/Great/SRS-Protocol/pfsense_plugin')
+PLUGIN_DIR = '/home/Great/SRS-Protocol/pfsense_plugin'
+sys.path.insert(0, PLUGIN_DIR)
 
 # Mock pfSense-specific functions
-def mock_mwexec(command, output=False):
-    """Mock mwexec function that executes system commands"""
-    if output:
-        return 0  # Success
-    else:
-        print(f"Mock executing: {command}")
+
+# Loads IPs read from stdin into the OraSRS pf table
+PFCTL_TABLE_ADD_ARGV = ('/sbin/pfctl', '-t', 'orasrs_blocked', '-T', 'add', '-f', '-')
+
+def mock_pfctl_pipe(argv, data):
+    """Mock running argv without a shell and piping data to its stdin; returns the exit code"""
+    return 0  # Success
+
+def _is_valid_ip(ip):
+    """Mirror of the plugin's filter_var(FILTER_VALIDATE_IP) check"""
+    if not isinstance(ip, str):
+        return False
+    try:
+        ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return True
 
 def mock_system(command):
     """Mock system function"""
@@ -39,8 +73,11 @@ sys.modules['config.inc'] = Mock()
 import builtins
 original_import = builtins.__import__
 
+# mock_import runs on every import in the test process, so keep the check a hashed lookup
+_MOCKED = frozenset({'functions.inc', 'filter.inc', 'services.inc', 'config.inc', 'guiconfig.inc'})
+
 def mock_import(name, *args, **kwargs):
-    if name in ['functions.inc', 'filter.inc', 'services.inc', 'config.inc', 'guiconfig.inc']:
+    if name in _MOCKED:
         return Mock()
     return original_import(name, *args, **kwargs)
 
@@ -51,14 +88,46 @@ plugin_file = '/home/Great/SRS-Protocol/pfsense_plugin/orasrs_plugin.php'
 temp_file = '/home/Great/SRS-Protocol/pfsense_plugin/orasrs_plugin_php.txt'
 
 # Since we can't directly import PHP, we'll create a Python representation of the plugin functionality for testing
-import uuid
+from dataclasses import dataclass, fields
+
+@dataclass(slots=True, frozen=True)
+class Threat:
+    """Threat record returned by the OraSRS threat feed"""
+    id: str
+    source_ip: str
+    threat_type: str
+    threat_level: str
+    credibility_score: float
+    consensus_verified: bool
+    context: str
+
+@dataclass(slots=True, frozen=True)
+class UpstreamThreat:
+    """Threat record returned by an upstream feed such as CISA AIS"""
+    id: str
+    source_ip: str
+    threat_type: str
+    threat_level: str
+    confidence: float
+    description: str
+
+# (source_ip, credibility) getters for each feed's record type
+_THREAT_IP_CRED = attrgetter('source_ip', 'credibility_score')
+_UPSTREAM_IP_CRED = attrgetter('source_ip', 'confidence')
+# Field getters for normalized blocklist entries
+_ENTRY_IP = itemgetter('ip')
+_ENTRY_CRED = itemgetter('credibility_score')
 
 class MockOraSRSPlugin:
     """Mock version of the pfSense OraSRS Plugin for testing"""
     
     def __init__(self):
         # Use a unique temporary file for each instance to test persistence
-        self.config_file = f'/tmp/orasrs_config_{uuid.uuid4().hex}.json'
+        if _USE_FAKE_FS:
+            self.config_file = f'/tmp/orasrs_config_{next(_FAKE_FS_IDS)}.json'
+        else:
+            fd, self.config_file = tempfile.mkstemp(prefix='orasrs_config_', suffix='.json')
+            os.close(fd)
         self.settings = {
             'enabled': True,
             'api_endpoint': 'https://api.orasrs.example.com',
@@ -73,16 +142,54 @@ class MockOraSRSPlugin:
                 'other_source': False
             }
         }
+        # pfSense command runner
+        self.pfctl_pipe = mock_pfctl_pipe
+        self._dirty = False
+        # Feed responses keyed by feed name, as (expires_at, response)
+        self._feed_cache = {}
+        self._pipeline = self._compile_pipeline()
         self._save_settings()
     
     def _save_settings(self):
-        with open(self.config_file, 'w') as f:
-            json.dump(self.settings, f)
+        if _USE_FAKE_FS:
+            _FAKE_FS[self.config_file] = _dumps(self.settings)
+        else:
+            # Write a sibling file and rename it over the config so readers
+            # never see a truncated file
+            tmp_file = self.config_file + '.tmp'
+            try:
+                with open(tmp_file, 'wb') as f:
+                    f.write(_dumps(self.settings))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, self.config_file)
+            except OSError:
+                # A failed write must never replace the good config
+                if os.path.exists(tmp_file):
+                    os.unlink(tmp_file)
+                raise
+        self._dirty = False
+    
+    def flush(self):
+        """Write settings back to the config file if they changed since the last save"""
+        if self._dirty:
+            self._save_settings()
     
     def load_settings(self):
-        if os.path.exists(self.config_file):
-            with open(self.config_file, 'r') as f:
-                self.settings = json.load(f)
+        if _USE_FAKE_FS:
+            data = _FAKE_FS.get(self.config_file)
+        else:
+            try:
+                with open(self.config_file, 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                data = None
+        
+        if data is not None:
+            self.settings = _loads(data)
+            self._feed_cache.clear()
+            self._pipeline = self._compile_pipeline()
+            self._dirty = False
         else:
             self._save_settings()
     
@@ -90,119 +197,161 @@ class MockOraSRSPlugin:
         return self.settings
     
     def update_settings(self, new_settings):
+        # Settings are served from memory; the file is only rewritten on flush()
         self.settings.update(new_settings)
-        self._save_settings()
+        self._feed_cache.clear()
+        self._pipeline = self._compile_pipeline()
+        self._dirty = True
+    
+    def _cached_feed(self, name, fetch):
+        """Reuse a feed response for update_interval seconds before fetching it again"""
+        now = time.monotonic()
+        cached = self._feed_cache.get(name)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        response = fetch()
+        self._feed_cache[name] = (now + self.settings['update_interval'], response)
+        return response
     
     def fetch_threat_intelligence(self):
         if not self.settings['enabled']:
             return {'error': 'Plugin not enabled'}
-        
+        return self._cached_feed('threats', self._request_threats)
+    
+    def _request_threats(self):
         # Simulate API response
         return {
             'threats': [
-                {
-                    'id': 'threat-123',
-                    'source_ip': '192.168.1.100',
-                    'threat_type': 'Malware',
-                    'threat_level': 'Critical',
-                    'credibility_score': 0.85,
-                    'consensus_verified': True,
-                    'context': 'Test malware threat'
-                },
-                {
-                    'id': 'threat-456',
-                    'source_ip': '10.0.0.50',
-                    'threat_type': 'DDoS',
-                    'threat_level': 'Emergency',
-                    'credibility_score': 0.92,
-                    'consensus_verified': True,
-                    'context': 'Test DDoS threat'
-                }
+                Threat(
+                    id='threat-123',
+                    source_ip='192.168.1.100',
+                    threat_type='Malware',
+                    threat_level='Critical',
+                    credibility_score=0.85,
+                    consensus_verified=True,
+                    context='Test malware threat'
+                ),
+                Threat(
+                    id='threat-456',
+                    source_ip='10.0.0.50',
+                    threat_type='DDoS',
+                    threat_level='Emergency',
+                    credibility_score=0.92,
+                    consensus_verified=True,
+                    context='Test DDoS threat'
+                )
             ]
         }
     
     def fetch_upstream_intelligence(self):
         if not self.settings['enabled']:
             return {'error': 'Plugin not enabled'}
-        
+        return self._cached_feed('upstream_threats', self._request_upstream_threats)
+    
+    def _request_upstream_threats(self):
         # Simulate upstream API response (e.g., from CISA AIS)
         return {
             'upstream_threats': [
-                {
-                    'id': 'upstream-789',
-                    'source_ip': '203.0.113.10',
-                    'threat_type': 'Malware',
-                    'threat_level': 'Critical',
-                    'confidence': 0.95,
-                    'description': 'Malware IP from CISA AIS feed'
-                }
+                UpstreamThreat(
+                    id='upstream-789',
+                    source_ip='203.0.113.10',
+                    threat_type='Malware',
+                    threat_level='Critical',
+                    confidence=0.95,
+                    description='Malware IP from CISA AIS feed'
+                )
             ]
         }
     
+    @staticmethod
+    def _normalize(ip_list):
+        """Coerce blocklist input to {'ip', 'credibility_score'} dicts; bare IPs get full credibility"""
+        return [
+            {'ip': entry, 'credibility_score': 1.0} if isinstance(entry, str)
+            else {'ip': entry['ip'], 'credibility_score': entry.get('credibility_score', 1.0)}
+            for entry in ip_list
+        ]
+    
     def add_to_blocklist(self, ip_list):
-        blocked_ips = []
-        for ip_entry in ip_list:
-            ip = ip_entry if isinstance(ip_entry, str) else ip_entry['ip']
-            credibility = ip_entry.get('credibility_score', 1.0) if isinstance(ip_entry, dict) else 1.0
-            
-            if credibility >= self.settings['credibility_threshold']:
-                blocked_ips.append(ip)
-        
+        return self._block_entries(self._normalize(ip_list), self.settings['credibility_threshold'])
+    
+    def _block_entries(self, entries, threshold):
+        # pfctl rejects the whole batch on one bad address, so drop malformed entries up front
+        entries = [entry for entry in entries if _is_valid_ip(entry['ip'])]
+        # Split the batch into parallel IP/score columns, then filter the
+        # whole column against the threshold in one pass
+        ips = list(map(_ENTRY_IP, entries))
+        scores = map(_ENTRY_CRED, entries)
+        # Deduplicate while keeping feed order
+        blocked_ips = list(dict.fromkeys(compress(ips, (score >= threshold for score in scores))))
+        
+        if blocked_ips and self._pfctl_table_add(blocked_ips) != 0:
+            return []
         return blocked_ips
     
+    def _pfctl_table_add(self, ips):
+        # Load the whole batch into the table with a single pfctl process reading stdin
+        return self.pfctl_pipe(PFCTL_TABLE_ADD_ARGV, '\n'.join(ips).encode() + b'\n')
+    
     def create_firewall_table(self):
         # Mock creating firewall table
         return True
     
-    def process_threat_intelligence(self):
+    @staticmethod
+    def _collect_high_risk(records, get_ip_cred):
+        """Build blocklist entries from feed records using a (source_ip, credibility) getter"""
+        return [
+            {'ip': ip, 'credibility_score': cred}
+            for ip, cred in map(get_ip_cred, records) if ip
+        ]
+    
+    def _compile_pipeline(self):
+        """Build a process_threat_intelligence body with the current settings baked in"""
         if not self.settings['enabled']:
-            return False
+            return lambda: False
         
-        # Fetch threat intelligence
-        threat_data = self.fetch_threat_intelligence()
-        if 'error' in threat_data:
-            return False
+        if not self.settings['block_malicious_ips']:
+            # Nothing beyond the primary fetch has any effect unless blocking is enabled
+            def fetch_only():
+                return 'error' not in self.fetch_threat_intelligence()
+            return fetch_only
         
-        # Extract high-risk IPs
-        high_risk_ips = []
-        for threat in threat_data.get('threats', []):
-            if threat.get('source_ip') and threat.get('credibility_score', 0) >= self.settings['credibility_threshold']:
-                high_risk_ips.append({
-                    'ip': threat['source_ip'],
-                    'credibility_score': threat['credibility_score']
-                })
-        
-        # Add to blocklist if enabled
-        blocked_count = 0
-        if self.settings['block_malicious_ips'] and high_risk_ips:
-            blocked = self.add_to_blocklist(high_risk_ips)
-            blocked_count = len(blocked)
-        
-        # Process upstream intelligence if enabled
-        if self.settings['upstream_sources']['cisa_ais']:
-            upstream_data = self.fetch_upstream_intelligence()
-            if 'error' not in upstream_data:
-                upstream_ips = []
-                for threat in upstream_data.get('upstream_threats', []):
-                    if threat.get('source_ip'):
-                        upstream_ips.append({
-                            'ip': threat['source_ip'],
-                            'credibility_score': threat.get('confidence', 0.9)
-                        })
-                
-                if self.settings['block_malicious_ips'] and upstream_ips:
-                    blocked = self.add_to_blocklist(upstream_ips)
-                    blocked_count += len(blocked)
+        threshold = self.settings['credibility_threshold']
+        upstream_enabled = self.settings['upstream_sources']['cisa_ais']
         
-        return True
-
+        def fetch_and_block():
+            threat_data = self.fetch_threat_intelligence()
+            if 'error' in threat_data:
+                return False
+            
+            # Collect candidate IPs; _block_entries applies the credibility threshold
+            candidate_ips = self._collect_high_risk(threat_data.get('threats', []), _THREAT_IP_CRED)
+            
+            # Process upstream intelligence if enabled
+            if upstream_enabled:
+                upstream_data = self.fetch_upstream_intelligence()
+                if 'error' not in upstream_data:
+                    candidate_ips += self._collect_high_risk(
+                        upstream_data.get('upstream_threats', []), _UPSTREAM_IP_CRED)
+            
+            # Primary and upstream feeds share a single blocklist transaction
+            if candidate_ips:
+                # Entries from _collect_high_risk are already normalized
+                self._block_entries(candidate_ips, threshold)
+            
+            return True
+        return fetch_and_block
+    
+    def process_threat_intelligence(self):
+        return self._pipeline()
 
-class TestPFSensePlugin(unittest.TestCase):
-    """Test the OraSRS pfSense Plugin functionality"""
+class TestPFSensePluginReadOnly(unittest.TestCase):
+    """Test OraSRS pfSense Plugin behaviour that leaves the plugin untouched"""
     
-    def setUp(self):
-        """Set up test fixtures before each test method."""
-        self.plugin = MockOraSRSPlugin()
+    @classmethod
+    def setUpClass(cls):
+        """Set up one plugin shared by every test in the class."""
+        cls.plugin = MockOraSRSPlugin()
     
     def test_plugin_initialization(self):
         """Test that the plugin initializes with correct default settings"""
@@ -220,22 +369,6 @@ class TestPFSensePlugin(unittest.TestCase):
         self.assertEqual(settings['update_interval'], 300)
         self.assertEqual(settings['credibility_threshold'], 0.7)
     
-    def test_plugin_enable_disable(self):
-        """Test enabling and disabling the plugin"""
-        # Test initial state
-        settings = self.plugin.get_settings()
-        self.assertTrue(settings['enabled'])
-        
-        # Disable plugin
-        self.plugin.update_settings({'enabled': False})
-        settings = self.plugin.get_settings()
-        self.assertFalse(settings['enabled'])
-        
-        # Re-enable plugin
-        self.plugin.update_settings({'enabled': True})
-        settings = self.plugin.get_settings()
-        self.assertTrue(settings['enabled'])
-    
     def test_fetch_threat_intelligence(self):
         """Test fetching threat intelligence"""
         threat_data = self.plugin.fetch_threat_intelligence()
@@ -245,12 +378,11 @@ class TestPFSensePlugin(unittest.TestCase):
         
         # Check first threat structure
         first_threat = threat_data['threats'][0]
-        self.assertIn('id', first_threat)
-        self.assertIn('source_ip', first_threat)
-        self.assertIn('threat_type', first_threat)
-        self.assertIn('threat_level', first_threat)
-        self.assertIn('credibility_score', first_threat)
-        
+        self.assertIsInstance(first_threat, Threat)
+        field_names = {f.name for f in fields(first_threat)}
+        self.assertLessEqual(
+            {'id', 'source_ip', 'threat_type', 'threat_level', 'credibility_score'}, field_names)
+    
     def test_fetch_upstream_intelligence(self):
         """Test fetching upstream intelligence"""
         upstream_data = self.plugin.fetch_upstream_intelligence()
@@ -260,11 +392,71 @@ class TestPFSensePlugin(unittest.TestCase):
         
         # Check first upstream threat structure
         first_threat = upstream_data['upstream_threats'][0]
-        self.assertIn('id', first_threat)
-        self.assertIn('source_ip', first_threat)
-        self.assertIn('threat_type', first_threat)
-        self.assertIn('threat_level', first_threat)
-        self.assertIn('confidence', first_threat)
+        self.assertIsInstance(first_threat, UpstreamThreat)
+        field_names = {f.name for f in fields(first_threat)}
+        self.assertLessEqual(
+            {'id', 'source_ip', 'threat_type', 'threat_level', 'confidence'}, field_names)
+    
+    def test_blocklist_functionality(self):
+        """Test adding IPs to blocklist"""
+        test_ips = [
+            {'ip': '192.168.1.100', 'credibility_score': 0.85},
+            {'ip': '10.0.0.50', 'credibility_score': 0.92},
+            {'ip': '172.16.0.25', 'credibility_score': 0.4}  # Should be filtered out
+        ]
+        
+        blocked = self.plugin.add_to_blocklist(test_ips)
+        
+        # Should block the first two IPs (credibility >= 0.7) but not the third
+        self.assertIn('192.168.1.100', blocked)
+        self.assertIn('10.0.0.50', blocked)
+        self.assertNotIn('172.16.0.25', blocked)
+        self.assertEqual(len(blocked), 2)  # Only 2 should be blocked
+    
+    def test_blocklist_accepts_bare_ips(self):
+        """Test that bare IP strings are normalized and blocked with full credibility"""
+        blocked = self.plugin.add_to_blocklist(['192.168.1.100', {'ip': '172.16.0.25', 'credibility_score': 0.4}])
+        self.assertEqual(blocked, ['192.168.1.100'])
+    
+    def test_process_threat_intelligence(self):
+        """Test the full threat intelligence processing pipeline"""
+        result = self.plugin.process_threat_intelligence()
+        self.assertTrue(result)
+
+class TestPFSensePluginMutating(unittest.TestCase):
+    """Test OraSRS pfSense Plugin behaviour that changes plugin state"""
+    
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.plugin = MockOraSRSPlugin()
+    
+    def tearDown(self):
+        """Write back any settings changes the test left pending."""
+        self.plugin.flush()
+    
+    def test_plugin_enable_disable(self):
+        """Test enabling and disabling the plugin"""
+        # Test initial state
+        settings = self.plugin.get_settings()
+        self.assertTrue(settings['enabled'])
+        
+        # Disable plugin
+        self.plugin.update_settings({'enabled': False})
+        settings = self.plugin.get_settings()
+        self.assertFalse(settings['enabled'])
+        
+        # Re-enable plugin
+        self.plugin.update_settings({'enabled': True})
+        settings = self.plugin.get_settings()
+        self.assertTrue(settings['enabled'])
+    
+    def test_feed_cached_until_settings_change(self):
+        """Test that feed responses are reused until the settings change"""
+        first = self.plugin.fetch_threat_intelligence()
+        self.assertIs(self.plugin.fetch_threat_intelligence(), first)
+        
+        self.plugin.update_settings({'update_interval': 600})
+        self.assertIsNot(self.plugin.fetch_threat_intelligence(), first)
     
     def test_credibility_filtering(self):
         """Test that only high-credibility threats are processed"""
@@ -276,36 +468,73 @@ class TestPFSensePlugin(unittest.TestCase):
         high_risk_ips = []
         
         for threat in threat_data.get('threats', []):
-            if threat.get('credibility_score', 0) >= self.plugin.get_settings()['credibility_threshold']:
-                high_risk_ips.append(threat['source_ip'])
+            if threat.credibility_score >= self.plugin.get_settings()['credibility_threshold']:
+                high_risk_ips.append(threat.source_ip)
         
         # Only the threat with 0.92 credibility should pass the filter (0.85 won't pass)
         self.assertLessEqual(len(high_risk_ips), 1)
         if high_risk_ips:
             # Find the threat with higher credibility
-            high_cred_threats = [t for t in threat_data['threats'] if t['credibility_score'] >= 0.9]
+            high_cred_threats = [t for t in threat_data['threats'] if t.credibility_score >= 0.9]
             self.assertEqual(len(high_risk_ips), len(high_cred_threats))
     
-    def test_blocklist_functionality(self):
-        """Test adding IPs to blocklist"""
+    def test_blocklist_skips_invalid_ips(self):
+        """Test that malformed addresses are dropped instead of failing the whole pfctl batch"""
+        self.plugin.pfctl_pipe = Mock(return_value=0)
+        blocked = self.plugin.add_to_blocklist(['192.168.1.10', 'not-an-ip', '300.1.1.1', '2001:db8::1'])
+        
+        self.assertEqual(blocked, ['192.168.1.10', '2001:db8::1'])
+        self.assertEqual(self.plugin.pfctl_pipe.call_args[0][1], b'192.168.1.10\n2001:db8::1\n')
+    
+    def test_blocklist_int_threshold_and_missing_score(self):
+        """Test the threshold comparison with an int threshold and entries without a score"""
+        self.plugin.update_settings({'credibility_threshold': 1})
+        blocked = self.plugin.add_to_blocklist([
+            {'ip': '192.168.1.10', 'credibility_score': 0.9},
+            {'ip': '192.168.1.11', 'credibility_score': 1.0},
+            {'ip': '192.168.1.12'},
+        ])
+        
+        # A missing score defaults to full credibility, as for bare IPs
+        self.assertEqual(blocked, ['192.168.1.11', '192.168.1.12'])
+        
+        # An explicit None score is rejected rather than silently blocked
+        with self.assertRaises(TypeError):
+            self.plugin.add_to_blocklist([{'ip': '192.168.1.13', 'credibility_score': None}])
+    
+    def test_blocklist_single_pfctl_batch(self):
+        """Test that a blocklist update is loaded with one pfctl call"""
+        self.plugin.pfctl_pipe = Mock(return_value=0)
         test_ips = [
             {'ip': '192.168.1.100', 'credibility_score': 0.85},
             {'ip': '10.0.0.50', 'credibility_score': 0.92},
-            {'ip': '172.16.0.25', 'credibility_score': 0.4}  # Should be filtered out
+            {'ip': '192.168.1.100', 'credibility_score': 0.95}  # Duplicate from another feed
         ]
         
         blocked = self.plugin.add_to_blocklist(test_ips)
         
-        # Should block the first two IPs (credibility >= 0.7) but not the third
-        self.assertIn('192.168.1.100', blocked)
-        self.assertIn('10.0.0.50', blocked)
-        self.assertNotIn('172.16.0.25', blocked)
-        self.assertEqual(len(blocked), 2)  # Only 2 should be blocked
+        self.assertEqual(blocked, ['192.168.1.100', '10.0.0.50'])
+        self.plugin.pfctl_pipe.assert_called_once_with(
+            PFCTL_TABLE_ADD_ARGV, b'192.168.1.100\n10.0.0.50\n')
     
-    def test_process_threat_intelligence(self):
-        """Test the full threat intelligence processing pipeline"""
-        result = self.plugin.process_threat_intelligence()
-        self.assertTrue(result)
+    def test_process_follows_settings_changes(self):
+        """Test that the processing pipeline is rebuilt when settings change"""
+        self.plugin.update_settings({'enabled': False})
+        self.assertFalse(self.plugin.process_threat_intelligence())
+        
+        self.plugin.update_settings({'enabled': True})
+        self.assertTrue(self.plugin.process_threat_intelligence())
+    
+    def test_process_skips_collection_when_blocking_disabled(self):
+        """Test that no feed records are collected when IP blocking is off"""
+        self.plugin.update_settings({'block_malicious_ips': False})
+        
+        with patch.object(self.plugin, 'fetch_upstream_intelligence') as upstream, \
+                patch.object(self.plugin, '_block_entries') as add:
+            self.assertTrue(self.plugin.process_threat_intelligence())
+        
+        upstream.assert_not_called()
+        add.assert_not_called()
     
     def test_upstream_source_control(self):
         """Test enabling/disabling upstream sources"""
@@ -334,7 +563,6 @@ class TestPFSensePlugin(unittest.TestCase):
     def test_settings_persistence(self):
         """Test that settings are properly saved and loaded"""
         # Create a plugin instance with a fixed config file
-        import tempfile
         config_file = '/tmp/orasrs_config_test.json'
         
         # Create the first instance and update settings
@@ -348,6 +576,7 @@ class TestPFSensePlugin(unittest.TestCase):
             'credibility_threshold': 0.8
         }
         plugin1.update_settings(new_settings)
+        plugin1.flush()
         
         # Create a second instance that uses the same config file
         plugin2 = MockOraSRSPlugin()
@@ -359,18 +588,59 @@ class TestPFSensePlugin(unittest.TestCase):
         self.assertEqual(settings2['api_endpoint'], 'https://new-api.orasrs.example.com')
         self.assertEqual(settings2['update_interval'], 600)
         self.assertEqual(settings2['credibility_threshold'], 0.8)
-
+    
+    @unittest.skipIf(_USE_FAKE_FS, "exercises the on-disk write path")
+    def test_failed_save_keeps_existing_config(self):
+        """Test that a failed settings write leaves the previous config in place"""
+        with open(self.plugin.config_file, 'rb') as f:
+            before = f.read()
+        
+        self.plugin.update_settings({'update_interval': 600})
+        with patch('os.fsync', side_effect=OSError(28, 'No space left on device')):
+            with self.assertRaises(OSError):
+                self.plugin.flush()
+        
+        with open(self.plugin.config_file, 'rb') as f:
+            self.assertEqual(f.read(), before)
+        self.assertFalse(os.path.exists(self.plugin.config_file + '.tmp'))
+        # The change is still pending, so a later flush can retry it
+        self.assertTrue(self.plugin._dirty)
+    
+    def test_settings_written_back_on_flush(self):
+        """Test that settings changes are only written to disk on flush"""
+        self.plugin.update_settings({'update_interval': 900})
+        
+        reader = MockOraSRSPlugin()
+        reader.config_file = self.plugin.config_file
+        reader.load_settings()
+        self.assertEqual(reader.get_settings()['update_interval'], 300)
+        
+        self.plugin.flush()
+        reader.load_settings()
+        self.assertEqual(reader.get_settings()['update_interval'], 900)
 
 class TestPFSensePluginFiles(unittest.TestCase):
     """Test the pfSense plugin files exist and have correct content"""
     
+    PLUGIN_PHP_PATH = os.path.join(PLUGIN_DIR, 'orasrs_plugin.php')
+    MANIFEST_PATH = os.path.join(PLUGIN_DIR, 'orasrs_pkg.xml')
+    FORM_PATH = os.path.join(PLUGIN_DIR, 'orasrs_form.xml')
+    INSTALL_SCRIPT_PATH = os.path.join(PLUGIN_DIR, 'install.sh')
+    UNINSTALL_SCRIPT_PATH = os.path.join(PLUGIN_DIR, 'uninstall.sh')
+    
+    @classmethod
+    def setUpClass(cls):
+        """Read each plugin file once for all tests."""
+        cls._files = {}
+        for path in (cls.PLUGIN_PHP_PATH, cls.MANIFEST_PATH, cls.FORM_PATH, cls.INSTALL_SCRIPT_PATH, cls.UNINSTALL_SCRIPT_PATH):
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    cls._files[path] = f.read()
+    
     def test_plugin_php_exists(self):
         """Test that the plugin PHP file exists"""
-        plugin_path = '/home/Great/SRS-Protocol/pfsense_plugin/orasrs_plugin.php'
-        self.assertTrue(os.path.exists(plugin_path), "Plugin PHP file should exist")
-        
-        with open(plugin_path, 'r') as f:
-            content = f.read()
+        self.assertIn(self.PLUGIN_PHP_PATH, self._files, "Plugin PHP file should exist")
+        content = self._files[self.PLUGIN_PHP_PATH]
         
         self.assertIn("OraSRS", content)
         self.assertIn("Threat Intelligence", content)
@@ -378,11 +648,8 @@ class TestPFSensePluginFiles(unittest.TestCase):
     
     def test_pkg_manifest_exists(self):
         """Test that the package manifest exists"""
-        manifest_path = '/home/Great/SRS-Protocol/pfsense_plugin/orasrs_pkg.xml'
-        self.assertTrue(os.path.exists(manifest_path), "Package manifest should exist")
-        
-        with open(manifest_path, 'r') as f:
-            content = f.read()
+        self.assertIn(self.MANIFEST_PATH, self._files, "Package manifest should exist")
+        content = self._files[self.MANIFEST_PATH]
         
         self.assertIn("orasrs-threat-intelligence", content)
         self.assertIn("OraSRS v2.0 Threat Intelligence", content)
@@ -390,11 +657,8 @@ class TestPFSensePluginFiles(unittest.TestCase):
     
     def test_form_config_exists(self):
         """Test that the form configuration exists"""
-        form_path = '/home/Great/SRS-Protocol/pfsense_plugin/orasrs_form.xml'
-        self.assertTrue(os.path.exists(form_path), "Form configuration should exist")
-        
-        with open(form_path, 'r') as f:
-            content = f.read()
+        self.assertIn(self.FORM_PATH, self._files, "Form configuration should exist")
+        content = self._files[self.FORM_PATH]
         
         self.assertIn("OraSRS v2.0 Threat Intelligence Configuration", content)
         self.assertIn("Enable OraSRS Integration", content)
@@ -403,22 +667,16 @@ class TestPFSensePluginFiles(unittest.TestCase):
     
     def test_install_script_exists(self):
         """Test that the install script exists"""
-        script_path = '/home/Great/SRS-Protocol/pfsense_plugin/install.sh'
-        self.assertTrue(os.path.exists(script_path), "Install script should exist")
-        
-        with open(script_path, 'r') as f:
-            content = f.read()
+        self.assertIn(self.INSTALL_SCRIPT_PATH, self._files, "Install script should exist")
+        content = self._files[self.INSTALL_SCRIPT_PATH]
         
         self.assertIn("OraSRS v2.0 Threat Intelligence Plugin", content)
         self.assertIn("pfctl -t orasrs_blocked", content)
     
     def test_uninstall_script_exists(self):
         """Test that the uninstall script exists"""
-        script_path = '/home/Great/SRS-Protocol/pfsense_plugin/uninstall.sh'
-        self.assertTrue(os.path.exists(script_path), "Uninstall script should exist")
-        
-        with open(script_path, 'r') as f:
-            content = f.read()
+        self.assertIn(self.UNINSTALL_SCRIPT_PATH, self._files, "Uninstall script should exist")
+        content = self._files[self.UNINSTALL_SCRIPT_PATH]
         
         self.assertIn("OraSRS v2.0 Threat Intelligence Plugin", content)
         self.assertIn("pfctl -t orasrs_blocked", content)
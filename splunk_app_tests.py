@@ -3,196 +3,231 @@
 
 import unittest
 import os
+from pathlib import Path
 import xml.etree.ElementTree as ET
 import json
 
+# Dashboard XML is parsed with lxml when available
+try:
+    from lxml import etree
+
+    def _parse_xml(data):
+        return etree.fromstring(data).getroottree()
+
+    _XMLParseError = etree.XMLSyntaxError
+except ImportError:
+    def _parse_xml(data):
+        return ET.ElementTree(ET.fromstring(data))
+
+    _XMLParseError = ET.ParseError
+
+
+APP_DIR = "/home/Great/SRS-Protocol/splunk_app"
+DEFAULT_DIR = os.path.join(APP_DIR, "default")
+APP_CONF_PATH = os.path.join(DEFAULT_DIR, "app.conf")
+DASHBOARD_PATH = os.path.join(DEFAULT_DIR, "data/ui/views/orasrs_dashboard.xml")
+PROPS_CONF_PATH = os.path.join(DEFAULT_DIR, "props.conf")
+TRANSFORMS_CONF_PATH = os.path.join(DEFAULT_DIR, "transforms.conf")
+
+
+def _read_existing(paths):
+    """Read each existing file once as raw bytes, keyed by path"""
+    files = {}
+    for path in paths:
+        path_obj = Path(path)
+        if path_obj.exists():
+            files[path] = path_obj.read_bytes()
+    return files
+
+
+def _index_dashboard(root):
+    """Collect the dashboard label, panels, panel titles and search queries in one tree walk"""
+    label = None
+    panels = []
+    panel_titles = set()
+    queries = []
+    for elem in root.iter():
+        if elem.tag == "panel":
+            panels.append(elem)
+            title_elem = elem.find("title")
+            if title_elem is not None:
+                panel_titles.add(title_elem.text)
+        elif elem.tag == "search":
+            queries.extend(query.text.strip() for query in elem.findall("query") if query.text)
+        elif elem.tag == "label" and label is None:
+            label = elem
+    return label, panels, panel_titles, queries
+
+
+def _missing_substrings(required, content):
+    """Return the required substrings that do not occur in content"""
+    return {needle for needle in required if needle not in content}
+
+
+MANIFEST_REQUIRED = (
+    b"id = orasrs-threat-intelligence",
+    b"name = OraSRS v2.0 Threat Intelligence",
+    b"version = 2.0.0",
+    b"author = OraSRS Protocol Team",
+    b"description = Integration with OraSRS v2.0",
+)
+
+# Threat enum alternations used by the orasrs_threat_fields extraction
+THREAT_TYPE_PATTERN = rb"DDoS|Malware|Phishing|BruteForce|SuspiciousConnection|AnomalousBehavior|IoCMatch"
+THREAT_LEVEL_PATTERN = rb"Info|Warning|Critical|Emergency"
+
+FIELD_EXTRACTION_REQUIRED = (
+    # threat_id pattern
+    b"threat_id",
+    b"threat-[a-f0-9-]{36}",
+    # threat type pattern
+    THREAT_TYPE_PATTERN,
+    # threat level pattern
+    THREAT_LEVEL_PATTERN,
+    # IP pattern; the actual pattern in transforms.conf is more complex
+    b"source_ip",
+    b"0-9]",
+)
+
+FIELD_FORMAT_REQUIRED = (
+    b"FORMAT =",
+    b"threat_id::",
+    b"threat_type::",
+    b"threat_level::",
+    b"credibility_score::",
+    b"consensus_confirmed::",
+)
+
+REQUIRED_PANEL_TITLES = frozenset({
+    "Threat Intelligence Overview",
+    "Recent Threats",
+    "Threat Origins by Geography",
+    "Threat Types Distribution",
+    "Consensus Verification Status",
+    "Top Threat Sources",
+})
+
 
 class TestSplunkApp(unittest.TestCase):
     """Test the OraSRS Splunk App configuration and functionality"""
     
-    def setUp(self):
-        """Set up test fixtures before each test method."""
-        self.app_dir = "/home/Great/SRS-Protocol/splunk_app"
-        self.default_dir = os.path.join(self.app_dir, "default")
+    @classmethod
+    def setUpClass(cls):
+        """Read and parse the app configuration once for all tests."""
+        cls._files = _read_existing([APP_CONF_PATH, DASHBOARD_PATH, PROPS_CONF_PATH, TRANSFORMS_CONF_PATH])
+        cls._dashboard_tree = None
+        cls._dashboard_error = None
+        if DASHBOARD_PATH in cls._files:
+            try:
+                cls._dashboard_tree = _parse_xml(cls._files[DASHBOARD_PATH])
+            except _XMLParseError as e:
+                cls._dashboard_error = e
+        cls._dashboard_label, cls._panels, cls._panel_titles, cls._queries = (
+            _index_dashboard(cls._dashboard_tree.getroot())
+            if cls._dashboard_tree is not None else (None, [], set(), [])
+        )
         
     def test_app_conf_exists(self):
         """Test that app.conf exists and is properly formatted"""
-        app_conf_path = os.path.join(self.default_dir, "app.conf")
-        self.assertTrue(os.path.exists(app_conf_path), "app.conf should exist")
-        
-        with open(app_conf_path, 'r') as f:
-            content = f.read()
+        self.assertIn(APP_CONF_PATH, self._files, "app.conf should exist")
+        content = self._files[APP_CONF_PATH]
             
         # Check for required fields
-        self.assertIn("OraSRS v2.0 Threat Intelligence", content)
-        self.assertIn("orasrs-threat-intelligence", content)
-        self.assertIn("OraSRS Protocol Team", content)
+        self.assertIn(b"OraSRS v2.0 Threat Intelligence", content)
+        self.assertIn(b"orasrs-threat-intelligence", content)
+        self.assertIn(b"OraSRS Protocol Team", content)
     
     def test_dashboard_xml_exists_and_valid(self):
         """Test that dashboard XML exists and is valid XML"""
-        dashboard_path = os.path.join(self.default_dir, "data/ui/views/orasrs_dashboard.xml")
-        self.assertTrue(os.path.exists(dashboard_path), "Dashboard XML should exist")
+        self.assertIn(DASHBOARD_PATH, self._files, "Dashboard XML should exist")
         
-        # Parse the XML to ensure it's valid
-        try:
-            tree = ET.parse(dashboard_path)
-            root = tree.getroot()
-            
-            # Verify the dashboard has the correct label
-            label_elem = root.find(".//label")
-            self.assertIsNotNone(label_elem, "Dashboard should have a label")
-            self.assertIn("OraSRS v2.0 Threat Intelligence Dashboard", label_elem.text)
-            
-            # Check for required panels
-            panels = root.findall(".//panel")
-            self.assertGreaterEqual(len(panels), 4, "Dashboard should have at least 4 panels")
-            
-        except ET.ParseError as e:
-            self.fail(f"Dashboard XML is not valid: {str(e)}")
+        # The XML was parsed in setUpClass to ensure it's valid
+        if self._dashboard_error is not None:
+            self.fail(f"Dashboard XML is not valid: {str(self._dashboard_error)}")
+        
+        # Verify the dashboard has the correct label
+        label_elem = self._dashboard_label
+        self.assertIsNotNone(label_elem, "Dashboard should have a label")
+        self.assertIn("OraSRS v2.0 Threat Intelligence Dashboard", label_elem.text)
+        
+        # Check for required panels
+        self.assertGreaterEqual(len(self._panels), 4, "Dashboard should have at least 4 panels")
     
     def test_props_conf_exists(self):
         """Test that props.conf exists and is properly configured"""
-        props_conf_path = os.path.join(self.default_dir, "props.conf")
-        self.assertTrue(os.path.exists(props_conf_path), "props.conf should exist")
-        
-        with open(props_conf_path, 'r') as f:
-            content = f.read()
+        self.assertIn(PROPS_CONF_PATH, self._files, "props.conf should exist")
+        content = self._files[PROPS_CONF_PATH]
             
-        self.assertIn("orasrs_threats", content)
-        self.assertIn("orasrs:threat", content)
-        self.assertIn("TRANSFORMS-threat_fields", content)
+        self.assertIn(b"orasrs_threats", content)
+        self.assertIn(b"orasrs:threat", content)
+        self.assertIn(b"TRANSFORMS-threat_fields", content)
     
     def test_transforms_conf_exists(self):
         """Test that transforms.conf exists and is properly configured"""
-        transforms_path = os.path.join(self.default_dir, "transforms.conf")
-        self.assertTrue(os.path.exists(transforms_path), "transforms.conf should exist")
-        
-        with open(transforms_path, 'r') as f:
-            content = f.read()
+        self.assertIn(TRANSFORMS_CONF_PATH, self._files, "transforms.conf should exist")
+        content = self._files[TRANSFORMS_CONF_PATH]
             
-        self.assertIn("orasrs_threat_fields", content)
-        self.assertIn("orasrs_ip_fields", content)
-        self.assertIn("threat_id", content)
-        self.assertIn("threat_type", content)
-        self.assertIn("REGEX", content)
+        self.assertIn(b"orasrs_threat_fields", content)
+        self.assertIn(b"orasrs_ip_fields", content)
+        self.assertIn(b"threat_id", content)
+        self.assertIn(b"threat_type", content)
+        self.assertIn(b"REGEX", content)
     
     def test_dashboard_has_required_panels(self):
         """Test that the dashboard has all required panels"""
-        dashboard_path = os.path.join(self.default_dir, "data/ui/views/orasrs_dashboard.xml")
-        tree = ET.parse(dashboard_path)
-        root = tree.getroot()
-        
-        # Find all panel titles
-        panel_titles = []
-        for panel in root.findall(".//panel"):
-            title_elem = panel.find("title")
-            if title_elem is not None:
-                panel_titles.append(title_elem.text)
-        
-        required_titles = [
-            "Threat Intelligence Overview",
-            "Recent Threats", 
-            "Threat Origins by Geography",
-            "Threat Types Distribution",
-            "Consensus Verification Status",
-            "Top Threat Sources"
-        ]
-        
-        for title in required_titles:
-            self.assertIn(title, panel_titles, f"Dashboard should contain panel: {title}")
+        # Panel titles were collected into a set in setUpClass
+        missing = REQUIRED_PANEL_TITLES - self._panel_titles
+        self.assertFalse(missing, f"Missing panels: {missing}")
     
     def test_search_queries_valid(self):
         """Test that search queries in dashboard are properly formatted"""
-        dashboard_path = os.path.join(self.default_dir, "data/ui/views/orasrs_dashboard.xml")
-        tree = ET.parse(dashboard_path)
-        root = tree.getroot()
-        
-        # Find all search queries
-        queries = []
-        for search in root.findall(".//search/query"):
-            if search is not None and search.text:
-                queries.append(search.text.strip())
-        
         # Check that queries contain required elements
-        for query in queries:
+        for query in self._queries:
             # All queries should reference the orasrs index
             self.assertIn("index=\"orasrs\"", query, f"Query should reference orasrs index: {query}")
     
     def test_field_extraction_patterns(self):
         """Test that field extraction patterns are correctly defined"""
-        transforms_path = os.path.join(self.default_dir, "transforms.conf")
-        with open(transforms_path, 'r') as f:
-            content = f.read()
+        content = self._files[TRANSFORMS_CONF_PATH]
         
-        # Check that threat_id pattern exists
-        self.assertIn("threat_id", content)
-        self.assertIn("threat-[a-f0-9-]{36}", content)
-        
-        # Check that threat type pattern exists
-        self.assertIn("DDoS|Malware|Phishing|BruteForce|SuspiciousConnection|AnomalousBehavior|IoCMatch", content)
-        
-        # Check that threat level pattern exists
-        self.assertIn("Info|Warning|Critical|Emergency", content)
-        
-        # Check that IP pattern exists
-        self.assertIn("source_ip", content)
-        # The actual pattern in transforms.conf is more complex
-        self.assertIn("0-9]", content)  # Basic check for IP pattern
+        missing = _missing_substrings(FIELD_EXTRACTION_REQUIRED, content)
+        self.assertFalse(missing, f"transforms.conf is missing extraction patterns: {missing}")
     
     def test_app_manifest_content(self):
         """Test that app manifest has required content"""
-        app_conf_path = os.path.join(self.default_dir, "app.conf")
-        with open(app_conf_path, 'r') as f:
-            content = f.readlines()
-        
-        # Convert to a single string for easier checking
-        full_content = ''.join(content)
+        full_content = self._files[APP_CONF_PATH]
         
-        self.assertIn("id = orasrs-threat-intelligence", full_content)
-        self.assertIn("name = OraSRS v2.0 Threat Intelligence", full_content)
-        self.assertIn("version = 2.0.0", full_content)
-        self.assertIn("author = OraSRS Protocol Team", full_content)
-        self.assertIn("description = Integration with OraSRS v2.0", full_content)
+        missing = _missing_substrings(MANIFEST_REQUIRED, full_content)
+        self.assertFalse(missing, f"app.conf is missing manifest entries: {missing}")
 
 
 class TestSplunkAppIntegration(unittest.TestCase):
     """Test integration aspects of the Splunk App"""
     
-    def setUp(self):
-        """Set up test fixtures before each test method."""
-        self.app_dir = "/home/Great/SRS-Protocol/splunk_app"
-        self.default_dir = os.path.join(self.app_dir, "default")
+    @classmethod
+    def setUpClass(cls):
+        """Read the app configuration once for all tests."""
+        cls._files = _read_existing([PROPS_CONF_PATH, TRANSFORMS_CONF_PATH])
     
     def test_source_type_consistency(self):
         """Test that sourcetype is consistently defined across configuration files"""
         # Check props.conf
-        props_path = os.path.join(self.default_dir, "props.conf")
-        with open(props_path, 'r') as f:
-            props_content = f.read()
+        props_content = self._files[PROPS_CONF_PATH]
         
         # Check transforms.conf
-        transforms_path = os.path.join(self.default_dir, "transforms.conf")
-        with open(transforms_path, 'r') as f:
-            transforms_content = f.read()
+        transforms_content = self._files[TRANSFORMS_CONF_PATH]
         
         # The sourcetype should be referenced consistently
-        self.assertIn("orasrs:threat", props_content)
-        self.assertIn("orasrs_threat_fields", transforms_content)
+        self.assertIn(b"orasrs:threat", props_content)
+        self.assertIn(b"orasrs_threat_fields", transforms_content)
     
     def test_field_extraction_format(self):
         """Test that field extraction format is correct"""
-        transforms_path = os.path.join(self.default_dir, "transforms.conf")
-        with open(transforms_path, 'r') as f:
-            content = f.read()
+        content = self._files[TRANSFORMS_CONF_PATH]
         
-        # Check that FORMAT is properly defined
-        self.assertIn("FORMAT =", content)
-        # Each extracted field should be properly mapped
-        self.assertIn("threat_id::", content)
-        self.assertIn("threat_type::", content)
-        self.assertIn("threat_level::", content)
-        self.assertIn("credibility_score::", content)
-        self.assertIn("consensus_confirmed::", content)
+        # Check that FORMAT is properly defined and each extracted field is mapped
+        missing = _missing_substrings(FIELD_FORMAT_REQUIRED, content)
+        self.assertFalse(missing, f"transforms.conf is missing FORMAT mappings: {missing}")
 
 
 if __name__ == '__main__':
@@ -4,38 +4,247 @@ This integration connects to the OraSRS v2.0 decentralized threat intelligence n
 providing real-time threat data and consensus-verified intelligence.
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from collections import OrderedDict
 import requests
 import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import json
-
-import demistomock as demisto  # noqa: F401 pylint: disable=import-error
-from CommonServerPython import *  # noqa: F401 pylint: disable=import-error
-from CommonServerUserPython import *  # noqa: F401 pylint: disable=import-error
+import sys
+import threading
+import time
+
+# Request and response bodies use orjson when available
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj).encode()
+
+    _loads = json.loads
+
+import demistomock as demisto  # pylint: disable=import-error
+from CommonServerPython import (  # pylint: disable=import-error
+    BaseClient,
+    CommandResults,
+    DemistoException,
+    argToBoolean,
+    argToList,
+    return_results,
+    tableToMarkdown,
+)
 
 
 # Disable insecure warnings
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 
+# OraSRS v2.0 API paths
+_URL_HEALTH = '/api/v2.0/health'
+_URL_THREATS = '/api/v2.0/threats'
+_URL_THREATS_BULK = '/api/v2.0/threats:bulk'
+_URL_CONSENSUS_BULK = '/api/v2.0/threats/consensus:bulk'
+_URL_UPSTREAM = '/api/v2.0/threats/upstream'
+
+# Seconds to wait for the OraSRS API before giving up on a request
+REQUEST_TIMEOUT = 30
+# Pooled connections to the API host; sized for concurrent consensus fan-out
+POOL_MAXSIZE = 64
+# Retries for connection errors and gateway failures on idempotent requests
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.2
+RETRY_STATUSES = (502, 503, 504)
+# The health probe should fail fast rather than hold up test-module
+HEALTH_TIMEOUT = 5
+# Concurrent requests per fan-out (consensus lookups, evidence submissions); stays below the pool size
+FANOUT_MAX_WORKERS = 16
+# Default lifetime of cached GET responses, and how many are kept
+DEFAULT_CACHE_TTL = 10
+CACHE_MAX_ENTRIES = 256
+
+# (context key, API field, default) for each record type's context entry
+_THREAT_FIELDS = (
+    ('ID', 'id', None),
+    ('ThreatType', 'threat_type', None),
+    ('ThreatLevel', 'threat_level', None),
+    ('SourceIP', 'source_ip', None),
+    ('TargetIP', 'target_ip', None),
+    ('Timestamp', 'timestamp', None),
+    ('CredibilityScore', 'credibility_score', 0.0),
+    ('ConsensusVerified', 'consensus_verified', False),
+    ('Context', 'context', None),
+    ('EvidenceHash', 'evidence_hash', None),
+)
+_UPSTREAM_THREAT_FIELDS = (
+    ('ID', 'id', None),
+    ('SourceType', 'source_type', 'upstream'),
+    ('ThreatType', 'threat_type', None),
+    ('ThreatLevel', 'threat_level', None),
+    ('SourceIP', 'source_ip', None),
+    ('Timestamp', 'timestamp', None),
+    ('ConfidenceScore', 'confidence', 0.0),
+    ('Description', 'description', ''),
+    ('Source', 'source', 'upstream_feed'),
+)
+
+# Fields drawn from a small vocabulary; their values are interned so repeated
+# strings across large responses share one object
+_INTERNED_FIELDS = frozenset({'threat_type', 'threat_level', 'source_type', 'source'})
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _compile_fields(fields: Tuple[Tuple[str, str, Any], ...]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Build a record-to-context mapper for a field table, filling in the table's defaults"""
+    interned = tuple(key for key, field, _ in fields if field in _INTERNED_FIELDS)
+
+    def to_output(record: Dict[str, Any]) -> Dict[str, Any]:
+        output = {key: record.get(field, default) for key, field, default in fields}
+        for key in interned:
+            output[key] = _intern(output[key])
+        return output
+
+    return to_output
+
+
+_threat_fields_to_output = _compile_fields(_THREAT_FIELDS)
+_upstream_fields_to_output = _compile_fields(_UPSTREAM_THREAT_FIELDS)
+
+# Evidence fields every submission must carry, and defaults for the optional ones
+_EVIDENCE_REQUIRED: Tuple[str, ...] = ('source_ip', 'threat_type', 'context')
+_EVIDENCE_DEFAULTS: Dict[str, Any] = {
+    'target_ip': None,
+    'threat_level': 'Warning',
+    'network_flow': '',
+    'geolocation': 'unknown',
+    'agent_id': 'xsoar-integration',
+}
+
+# Columns shown in each command's war room table
+_THREAT_HEADERS: Tuple[str, ...] = (
+    'ID', 'ThreatType', 'ThreatLevel', 'SourceIP', 'CredibilityScore', 'ConsensusVerified', 'Context'
+)
+_THREAT_CONSENSUS_HEADERS: Tuple[str, ...] = (
+    'ID', 'ThreatType', 'ThreatLevel', 'SourceIP', 'CredibilityScore', 'ConsensusStatus'
+)
+_CONSENSUS_HEADERS: Tuple[str, ...] = (
+    'ThreatID', 'ConsensusStatus', 'ConfidenceScore', 'TotalVerifiers', 'ConsensusPercentage'
+)
+_SUBMISSION_HEADERS: Tuple[str, ...] = ('SubmittedThreatID', 'Status', 'Message')
+_UPSTREAM_HEADERS: Tuple[str, ...] = (
+    'ID', 'SourceType', 'ThreatType', 'ThreatLevel', 'SourceIP', 'ConfidenceScore', 'Description'
+)
+
+
+def _is_not_found(e: Exception) -> bool:
+    """Whether an API error was a 404, i.e. the server lacks the endpoint"""
+    res = getattr(e, 'res', None)
+    return res is not None and res.status_code == 404
+
+
 class Client(BaseClient):
     """Client class to interact with OraSRS v2.0 API"""
 
-    def __init__(self, base_url: str, api_key: str, verify_ssl: bool = True):
+    def __init__(self, base_url: str, api_key: str, verify_ssl: bool = True, cache_ttl: float = DEFAULT_CACHE_TTL):
         super().__init__(base_url=base_url, verify=verify_ssl)
         self._headers = {
             'Authorization': f'Bearer {api_key}',
             'Content-Type': 'application/json'
         }
+        # Reuse the requests.Session BaseClient already keeps for the client's lifetime,
+        # widening its connection pool rather than opening a second session
+        self._session.headers.update(self._headers)
+        # Retries live on the transport so individual calls don't implement their own back-off;
+        # the last response is returned rather than raised so _send reports its status
+        retry = Retry(total=RETRY_TOTAL, backoff_factor=RETRY_BACKOFF,
+                      status_forcelist=RETRY_STATUSES, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+        # Whether the server has the bulk consensus endpoint; unknown until first used
+        self._bulk_consensus_supported: Optional[bool] = None
+        self._bulk_submit_supported: Optional[bool] = None
+        # LRU of (fetched_at, response) for idempotent GETs; a TTL of 0 disables it
+        self._cache_ttl = cache_ttl
+        self._cache: 'OrderedDict[Tuple, Tuple[float, Any]]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Release the pooled connections"""
+        self._session.close()
+
+    def _send(self, method: str, url_suffix: str, json_data: Any = None, **kwargs) -> requests.Response:
+        """Send a request over the pooled session and return the successful response"""
+        if json_data is not None:
+            # The session already sends Content-Type: application/json
+            kwargs['data'] = _dumps(json_data)
+        kwargs.setdefault('timeout', REQUEST_TIMEOUT)
+        response = self._session.request(
+            method,
+            self._base_url + url_suffix,
+            verify=self._verify,
+            **kwargs
+        )
+        if not response.ok:
+            raise DemistoException(f'Error in API call [{response.status_code}] - {response.reason}', res=response)
+        return response
+
+    def _request(self, method: str, url_suffix: str, **kwargs) -> Dict[str, Any]:
+        """Send a request over the pooled session and return the decoded JSON body"""
+        return _loads(self._send(method, url_suffix, **kwargs).content)
+
+    def _cached_get(self, key: Tuple, fetch: Callable[[], Any]) -> Any:
+        """Return the cached response for key if it is younger than the TTL, else fetch and cache it"""
+        if self._cache_ttl <= 0:
+            return fetch()
+        now = time.monotonic()
+        with self._cache_lock:
+            hit = self._cache.get(key)
+            if hit is not None and now - hit[0] < self._cache_ttl:
+                self._cache.move_to_end(key)
+                return hit[1]
+        response = fetch()
+        with self._cache_lock:
+            self._cache[key] = (now, response)
+            self._cache.move_to_end(key)
+            while len(self._cache) > CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+        return response
+
+    def _get(self, url_suffix: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """GET through the response cache"""
+        key = ('GET', url_suffix, tuple(sorted(params.items())) if params else ())
+        return self._cached_get(key, lambda: self._request('GET', url_suffix, params=params))
+
+    @staticmethod
+    def _map_concurrently(fetch: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+        """Call fetch for every item on a thread pool; a failed call yields the exception it raised"""
+        def call(item: Any) -> Any:
+            try:
+                return fetch(item)
+            except Exception as e:
+                return e
+
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=min(FANOUT_MAX_WORKERS, len(items))) as executor:
+            return list(executor.map(call, items))
 
     def test_connection(self) -> Dict[str, Any]:
-        """Test the connection to OraSRS API"""
-        return self._http_request(
-            method='GET',
-            url_suffix='/api/v2.0/health',
-            headers=self._headers
-        )
+        """Test the connection to OraSRS API
+
+        The health body is always read: test_module checks its status, so a server
+        that answers 200 while reporting itself degraded still fails the test.
+        """
+        return self._request('GET', _URL_HEALTH, timeout=HEALTH_TIMEOUT)
 
     def get_threat_intelligence(self, threat_id: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
         """Get threat intelligence from OraSRS network"""
@@ -43,37 +252,72 @@ class Client(BaseClient):
         if threat_id:
             params['threat_id'] = threat_id
 
-        return self._http_request(
-            method='GET',
-            url_suffix='/api/v2.0/threats',
-            headers=self._headers,
-            params=params
-        )
+        return self._request('GET', _URL_THREATS, params=params)
 
     def get_consensus_verification(self, threat_id: str) -> Dict[str, Any]:
         """Get consensus verification status for a threat"""
-        return self._http_request(
-            method='GET',
-            url_suffix=f'/api/v2.0/threats/{threat_id}/consensus',
-            headers=self._headers
-        )
+        return self._get(f'{_URL_THREATS}/{threat_id}/consensus')
+
+    def get_consensus_verification_many(self, threat_ids: List[str]) -> Dict[str, Any]:
+        """Fetch consensus for several threats concurrently, keyed by threat ID
+
+        Failed lookups map to the exception they raised.
+        """
+        return dict(zip(threat_ids, self._map_concurrently(self.get_consensus_verification, threat_ids)))
+
+    def get_consensus_verification_bulk(self, threat_ids: List[str]) -> Dict[str, Any]:
+        """Fetch consensus for several threats in one request, keyed by threat ID
+
+        Falls back to concurrent per-threat lookups when the server has no bulk
+        endpoint; the 404 is remembered so later calls skip the probe.
+        """
+        if not threat_ids:
+            return {}
+        if self._bulk_consensus_supported is not False:
+            try:
+                response = self._request('POST', _URL_CONSENSUS_BULK, json_data={'ids': threat_ids})
+            except DemistoException as e:
+                if not _is_not_found(e):
+                    raise
+                self._bulk_consensus_supported = False
+            else:
+                self._bulk_consensus_supported = True
+                return response.get('results', {})
+        return self.get_consensus_verification_many(threat_ids)
 
     def submit_threat_evidence(self, evidence: Dict[str, Any]) -> Dict[str, Any]:
         """Submit threat evidence to OraSRS network"""
-        return self._http_request(
-            method='POST',
-            url_suffix='/api/v2.0/threats',
-            headers=self._headers,
-            json_data=evidence
-        )
+        return self._request('POST', _URL_THREATS, json_data=evidence)
+
+    def submit_threat_evidence_bulk(self, evidence_batch: List[Dict[str, Any]]) -> List[Any]:
+        """Submit several evidence records, returning one response per record in order
+
+        Uses the bulk endpoint when the server has it, otherwise submits the records
+        concurrently; there, a failed submission maps to the exception it raised.
+        """
+        if not evidence_batch:
+            return []
+        if self._bulk_submit_supported is not False:
+            try:
+                response = self._request('POST', _URL_THREATS_BULK, json_data=evidence_batch)
+            except DemistoException as e:
+                if not _is_not_found(e):
+                    raise
+                self._bulk_submit_supported = False
+            else:
+                self._bulk_submit_supported = True
+                results = response.get('results', [])
+                # Outputs are matched to records by position, so a short or long reply can't be used
+                if len(results) != len(evidence_batch):
+                    raise DemistoException(
+                        f'Bulk submission returned {len(results)} results for {len(evidence_batch)} records'
+                    )
+                return results
+        return self._map_concurrently(self.submit_threat_evidence, evidence_batch)
 
     def get_upstream_intelligence(self) -> Dict[str, Any]:
         """Get upstream threat intelligence (e.g., from CISA AIS)"""
-        return self._http_request(
-            method='GET',
-            url_suffix='/api/v2.0/threats/upstream',
-            headers=self._headers
-        )
+        return self._get(_URL_UPSTREAM)
 
 
 def test_module(client: Client) -> str:
@@ -88,6 +332,43 @@ def test_module(client: Client) -> str:
         return str(e)
 
 
+def threat_to_output(threat: Dict[str, Any]) -> Dict[str, Any]:
+    """Map an OraSRS threat record to its OraSRS.Threat context entry"""
+    return _threat_fields_to_output(threat)
+
+
+def consensus_to_output(threat_id: str, response: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a consensus verification response to its OraSRS.Consensus context entry"""
+    return {
+        'ThreatID': threat_id,
+        'ConsensusStatus': response.get('consensus_status'),
+        'ConfidenceScore': response.get('confidence_score', 0.0),
+        'TotalVerifiers': response.get('total_verifiers', 0),
+        'ConsensusPercentage': response.get('consensus_percentage', 0.0),
+        'VerifiedBy': response.get('verified_by', []),
+        'DisputedBy': response.get('disputed_by', [])
+    }
+
+
+def consensus_result_to_output(threat_id: str, result: Any) -> Dict[str, Any]:
+    """Map a bulk consensus result, which may be the exception a lookup raised, to its context entry
+
+    A missing or null result becomes an error entry, so every requested ID gets a row.
+    """
+    if result is None:
+        return {'ThreatID': threat_id, 'ErrorMessage': 'not returned by bulk endpoint'}
+    if isinstance(result, Exception):
+        return {'ThreatID': threat_id, 'ErrorMessage': str(result)}
+    return consensus_to_output(threat_id, result)
+
+
+def readable_table(title: str, rows: Any, headers: Tuple[str, ...], lite: bool = False) -> str:
+    """Render rows as a war room table, or just the title line in lite mode"""
+    if lite:
+        return title
+    return tableToMarkdown(title, rows, headers=headers)
+
+
 def get_threat_intelligence_command(client: Client, args: Dict[str, Any]) -> CommandResults:
     """Get threat intelligence from OraSRS network"""
     threat_id = args.get('threat_id')
@@ -96,26 +377,13 @@ def get_threat_intelligence_command(client: Client, args: Dict[str, Any]) -> Com
     response = client.get_threat_intelligence(threat_id=threat_id, limit=limit)
 
     # Prepare outputs
-    outputs = []
-    for threat in response.get('threats', []):
-        output = {
-            'ID': threat.get('id'),
-            'ThreatType': threat.get('threat_type'),
-            'ThreatLevel': threat.get('threat_level'),
-            'SourceIP': threat.get('source_ip'),
-            'TargetIP': threat.get('target_ip'),
-            'Timestamp': threat.get('timestamp'),
-            'CredibilityScore': threat.get('credibility_score', 0.0),
-            'ConsensusVerified': threat.get('consensus_verified', False),
-            'Context': threat.get('context'),
-            'EvidenceHash': threat.get('evidence_hash')
-        }
-        outputs.append(output)
+    outputs = [threat_to_output(threat) for threat in response.get('threats', [])]
 
-    readable_output = tableToMarkdown(
+    readable_output = readable_table(
         f"OraSRS Threat Intelligence ({len(outputs)} threats found)",
         outputs,
-        headers=['ID', 'ThreatType', 'ThreatLevel', 'SourceIP', 'CredibilityScore', 'ConsensusVerified', 'Context']
+        _THREAT_HEADERS,
+        lite=argToBoolean(args.get('lite', False))
     )
 
     return CommandResults(
@@ -127,25 +395,22 @@ def get_threat_intelligence_command(client: Client, args: Dict[str, Any]) -> Com
 
 
 def get_consensus_verification_command(client: Client, args: Dict[str, Any]) -> CommandResults:
-    """Get consensus verification status for a specific threat"""
-    threat_id = args['threat_id']
+    """Get consensus verification status for one threat, or a comma-separated list of threats"""
+    threat_ids = argToList(args['threat_id'])
+    if len(threat_ids) > 1:
+        return get_consensus_verification_bulk_command(
+            client, threat_ids, lite=argToBoolean(args.get('lite', False))
+        )
+    threat_id = threat_ids[0] if threat_ids else args['threat_id']
 
     response = client.get_consensus_verification(threat_id)
 
-    output = {
-        'ThreatID': threat_id,
-        'ConsensusStatus': response.get('consensus_status'),
-        'ConfidenceScore': response.get('confidence_score', 0.0),
-        'TotalVerifiers': response.get('total_verifiers', 0),
-        'ConsensusPercentage': response.get('consensus_percentage', 0.0),
-        'VerifiedBy': response.get('verified_by', []),
-        'DisputedBy': response.get('disputed_by', [])
-    }
+    output = consensus_to_output(threat_id, response)
 
     readable_output = tableToMarkdown(
         f"OraSRS Consensus Verification for Threat {threat_id}",
         output,
-        headers=['ThreatID', 'ConsensusStatus', 'ConfidenceScore', 'TotalVerifiers', 'ConsensusPercentage']
+        headers=_CONSENSUS_HEADERS
     )
 
     return CommandResults(
@@ -156,31 +421,108 @@ def get_consensus_verification_command(client: Client, args: Dict[str, Any]) ->
     )
 
 
-def submit_threat_evidence_command(client: Client, args: Dict[str, Any]) -> CommandResults:
-    """Submit threat evidence to OraSRS network"""
+def get_consensus_verification_bulk_command(client: Client, threat_ids: List[str],
+                                            lite: bool = False) -> CommandResults:
+    """Get consensus verification status for several threats with one bulk lookup"""
+    results = client.get_consensus_verification_bulk(threat_ids)
+    outputs = [consensus_result_to_output(threat_id, results.get(threat_id)) for threat_id in threat_ids]
+
+    readable_output = readable_table(
+        f"OraSRS Consensus Verification for {len(outputs)} Threats",
+        outputs,
+        _CONSENSUS_HEADERS,
+        lite=lite
+    )
+
+    return CommandResults(
+        readable_output=readable_output,
+        outputs_prefix='OraSRS.Consensus',
+        outputs_key_field='ThreatID',
+        outputs=outputs
+    )
+
+
+def get_threat_intel_with_consensus_command(client: Client, args: Dict[str, Any]) -> CommandResults:
+    """Get threat intelligence with the consensus status of every returned threat"""
+    threat_id = args.get('threat_id')
+    limit = int(args.get('limit', 50))
+
+    response = client.get_threat_intelligence(threat_id=threat_id, limit=limit)
+
+    outputs = [threat_to_output(threat) for threat in response.get('threats', [])]
+    consensus = client.get_consensus_verification_bulk([output['ID'] for output in outputs if output['ID']])
+    for output in outputs:
+        if output['ID'] in consensus:
+            output['Consensus'] = consensus_result_to_output(output['ID'], consensus[output['ID']])
+
+    title = f"OraSRS Threat Intelligence with Consensus ({len(outputs)} threats found)"
+    if argToBoolean(args.get('lite', False)):
+        readable_output = title
+    else:
+        table = [{**output, 'ConsensusStatus': output.get('Consensus', {}).get('ConsensusStatus')} for output in outputs]
+        readable_output = tableToMarkdown(title, table, headers=_THREAT_CONSENSUS_HEADERS)
+
+    return CommandResults(
+        readable_output=readable_output,
+        outputs_prefix='OraSRS.Threat',
+        outputs_key_field='ID',
+        outputs=outputs
+    )
+
+
+def build_evidence(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Build an evidence submission from command arguments, filling in defaults"""
     evidence = {
+        **_EVIDENCE_DEFAULTS,
         'source_ip': args['source_ip'],
-        'target_ip': args.get('target_ip'),
         'threat_type': args['threat_type'],
-        'threat_level': args.get('threat_level', 'Warning'),
         'context': args['context'],
-        'network_flow': args.get('network_flow', ''),
-        'geolocation': args.get('geolocation', 'unknown'),
-        'agent_id': args.get('agent_id', 'xsoar-integration')
     }
-
-    response = client.submit_threat_evidence(evidence)
-
-    output = {
+    evidence.update({key: args[key] for key in _EVIDENCE_DEFAULTS.keys() & args.keys()})
+    return evidence
+
+
+def parse_evidence_batch(value: Any) -> List[Dict[str, Any]]:
+    """Decode and validate the evidence_batch argument: a JSON array of evidence objects"""
+    if isinstance(value, (str, bytes)):
+        try:
+            value = _loads(value)
+        except ValueError as e:
+            raise DemistoException(f'evidence_batch is not valid JSON: {e}')
+    if not isinstance(value, list):
+        raise DemistoException('evidence_batch must be a JSON array of evidence objects')
+    for index, item in enumerate(value):
+        if not isinstance(item, dict):
+            raise DemistoException(f'evidence_batch[{index}] must be an object')
+        missing = [field for field in _EVIDENCE_REQUIRED if field not in item]
+        if missing:
+            raise DemistoException(f'evidence_batch[{index}] is missing required fields: {", ".join(missing)}')
+    return value
+
+
+def submission_to_output(response: Any) -> Dict[str, Any]:
+    """Map a submission response, which may be the exception a submission raised, to its context entry"""
+    if isinstance(response, Exception):
+        return {'SubmittedThreatID': None, 'Status': 'error', 'Message': str(response)}
+    return {
         'SubmittedThreatID': response.get('id'),
         'Status': response.get('status'),
         'Message': response.get('message', 'Threat evidence submitted successfully')
     }
 
+
+def submit_threat_evidence_command(client: Client, args: Dict[str, Any]) -> CommandResults:
+    """Submit threat evidence to OraSRS network"""
+    evidence = build_evidence(args)
+
+    response = client.submit_threat_evidence(evidence)
+
+    output = submission_to_output(response)
+
     readable_output = tableToMarkdown(
         "OraSRS Threat Evidence Submission",
         output,
-        headers=['SubmittedThreatID', 'Status', 'Message']
+        headers=_SUBMISSION_HEADERS
     )
 
     return CommandResults(
@@ -191,29 +533,39 @@ def submit_threat_evidence_command(client: Client, args: Dict[str, Any]) -> Comm
     )
 
 
+def submit_threat_evidence_bulk_command(client: Client, args: Dict[str, Any]) -> CommandResults:
+    """Submit a JSON array of threat evidence records to OraSRS network"""
+    batch = parse_evidence_batch(args['evidence_batch'])
+
+    responses = client.submit_threat_evidence_bulk([build_evidence(item) for item in batch])
+    outputs = [submission_to_output(response) for response in responses]
+
+    readable_output = readable_table(
+        f"OraSRS Threat Evidence Submission ({len(outputs)} records)",
+        outputs,
+        _SUBMISSION_HEADERS,
+        lite=argToBoolean(args.get('lite', False))
+    )
+
+    return CommandResults(
+        readable_output=readable_output,
+        outputs_prefix='OraSRS.Submission',
+        outputs_key_field='SubmittedThreatID',
+        outputs=outputs
+    )
+
+
 def get_upstream_intelligence_command(client: Client, args: Dict[str, Any]) -> CommandResults:
     """Get upstream threat intelligence (e.g., from CISA AIS)"""
     response = client.get_upstream_intelligence()
 
-    outputs = []
-    for threat in response.get('upstream_threats', []):
-        output = {
-            'ID': threat.get('id'),
-            'SourceType': threat.get('source_type', 'upstream'),
-            'ThreatType': threat.get('threat_type'),
-            'ThreatLevel': threat.get('threat_level'),
-            'SourceIP': threat.get('source_ip'),
-            'Timestamp': threat.get('timestamp'),
-            'ConfidenceScore': threat.get('confidence', 0.0),
-            'Description': threat.get('description', ''),
-            'Source': threat.get('source', 'upstream_feed')
-        }
-        outputs.append(output)
+    outputs = [_upstream_fields_to_output(threat) for threat in response.get('upstream_threats', [])]
 
-    readable_output = tableToMarkdown(
+    readable_output = readable_table(
         f"OraSRS Upstream Threat Intelligence ({len(outputs)} threats found)",
         outputs,
-        headers=['ID', 'SourceType', 'ThreatType', 'ThreatLevel', 'SourceIP', 'ConfidenceScore', 'Description']
+        _UPSTREAM_HEADERS,
+        lite=argToBoolean(args.get('lite', False))
     )
 
     return CommandResults(
@@ -224,6 +576,19 @@ def get_upstream_intelligence_command(client: Client, args: Dict[str, Any]) -> C
     )
 
 
+def parse_cache_ttl(value: Any) -> float:
+    """Parse the ttl_seconds parameter; unset means the default and 0 disables caching"""
+    if value is None or value == '':
+        return DEFAULT_CACHE_TTL
+    try:
+        ttl = float(value)
+    except (TypeError, ValueError):
+        raise DemistoException(f'Invalid ttl_seconds "{value}": must be a number of seconds (0 disables caching)')
+    if ttl < 0:
+        raise DemistoException(f'Invalid ttl_seconds "{value}": must not be negative (0 disables caching)')
+    return ttl
+
+
 def main():
     """Main function to handle XSOAR integration commands"""
     params = demisto.params()
@@ -234,17 +599,23 @@ def main():
     command = demisto.command()
     args = demisto.args()
 
-    client = Client(base_url=base_url, api_key=api_key, verify_ssl=verify_ssl)
-
+    client = None
     try:
+        cache_ttl = parse_cache_ttl(params.get('ttl_seconds'))
+        client = Client(base_url=base_url, api_key=api_key, verify_ssl=verify_ssl, cache_ttl=cache_ttl)
+
         if command == 'test-module':
             return_results(test_module(client))
         elif command == 'orasrs-get-threat-intelligence':
             return_results(get_threat_intelligence_command(client, args))
         elif command == 'orasrs-get-consensus-verification':
             return_results(get_consensus_verification_command(client, args))
+        elif command == 'orasrs-get-threat-intel-with-consensus':
+            return_results(get_threat_intel_with_consensus_command(client, args))
         elif command == 'orasrs-submit-threat-evidence':
             return_results(submit_threat_evidence_command(client, args))
+        elif command == 'orasrs-submit-threat-evidence-bulk':
+            return_results(submit_threat_evidence_bulk_command(client, args))
         elif command == 'orasrs-get-upstream-intelligence':
             return_results(get_upstream_intelligence_command(client, args))
     except Exception as e:
@@ -254,6 +625,9 @@ def main():
             outputs_prefix='OraSRS.Error',
             outputs={'ErrorMessage': str(e)}
         ))
+    finally:
+        if client is not None:
+            client.close()
 
 
 if __name__ in ('__main__', 'builtins'):
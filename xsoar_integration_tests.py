@@ -1,8 +1,10 @@
 import unittest
-from unittest.mock import Mock, MagicMock, patch, MagicMock
+from unittest.mock import Mock, patch, create_autospec
 import sys
 import os
+import types
 import json
+import requests
 from datetime import datetime
 
 # Add the XSOAR integration directory to the path
@@ -26,20 +28,92 @@ class MockDemisto:
 # Create mock for demistomock
 demisto_mock = MockDemisto()
 sys.modules['demistomock'] = demisto_mock
-sys.modules['CommonServerPython'] = Mock()
+
+
+class BaseClient:
+    def __init__(self, base_url, verify=True, proxy=False, ok_codes=(), headers=None, auth=None):
+        self._base_url = base_url
+        self._verify = verify
+        self._headers = headers
+        self._session = requests.Session()
+
+
+class DemistoException(Exception):
+    def __init__(self, message, exception=None, res=None, *args):
+        self.res = res
+        self.message = message
+        self.exception = exception
+        super().__init__(message, exception, *args)
+
+    def __str__(self):
+        return str(self.message)
+
+
+class CommandResults:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def argToBoolean(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in ('true', 'yes'):
+        return True
+    if isinstance(value, str) and value.lower() in ('false', 'no'):
+        return False
+    raise ValueError(f'Argument does not contain a valid boolean-like value: {value}')
+
+
+def argToList(arg, separator=','):
+    if not arg:
+        return []
+    if isinstance(arg, list):
+        return arg
+    return [item.strip() for item in arg.split(separator)]
+
+
+def tableToMarkdown(name, t, headers=None, **kwargs):
+    return name
+
+
+# Stand-in for the CommonServerPython names the integration imports; real
+# classes, so Client is a genuine subclass that create_autospec can spec
+common_server_python = types.ModuleType('CommonServerPython')
+common_server_python.BaseClient = BaseClient
+common_server_python.DemistoException = DemistoException
+common_server_python.CommandResults = CommandResults
+common_server_python.argToBoolean = argToBoolean
+common_server_python.argToList = argToList
+common_server_python.tableToMarkdown = tableToMarkdown
+common_server_python.return_results = Mock()
+sys.modules['CommonServerPython'] = common_server_python
 sys.modules['CommonServerUserPython'] = Mock()
 
-# Import after mocking dependencies
-from orasrs_integration import Client, test_module, get_threat_intelligence_command, get_consensus_verification_command, submit_threat_evidence_command, get_upstream_intelligence_command
+# Import after mocking dependencies; test_module is reached through the module
+# so pytest does not collect it as a test
+import orasrs_integration
+from orasrs_integration import POOL_MAXSIZE, RETRY_TOTAL, Client, DemistoException, get_threat_intelligence_command, get_consensus_verification_command, get_threat_intel_with_consensus_command, submit_threat_evidence_command, submit_threat_evidence_bulk_command, get_upstream_intelligence_command, parse_cache_ttl
 
 class TestXSOARIntegration(unittest.TestCase):
     """Test the OraSRS XSOAR Integration"""
     
+    BASE_URL = "https://api.orasrs.example.com"
+    API_KEY = "test-api-key"
+    YAML_PATH = '/home/Great/SRS-Protocol/xsoar_integration/orasrs_integration.yml'
+    
+    @classmethod
+    def setUpClass(cls):
+        """Build the autospec'd client and read the integration YAML once."""
+        cls.mock_client = create_autospec(Client, instance=True)
+        cls._yaml = None
+        if os.path.exists(cls.YAML_PATH):
+            with open(cls.YAML_PATH, 'r') as f:
+                cls._yaml = f.read()
+    
     def setUp(self):
         """Set up test fixtures before each test method."""
-        self.base_url = "https://api.orasrs.example.com"
-        self.api_key = "test-api-key"
-        self.client = Client(base_url=self.base_url, api_key=self.api_key, verify_ssl=False)
+        self.client = Client(base_url=self.BASE_URL, api_key=self.API_KEY, verify_ssl=False)
+        self.mock_client.reset_mock(return_value=True, side_effect=True)
         
     @patch('orasrs_integration.requests.get')
     def test_client_initialization(self, mock_get):
@@ -47,10 +121,20 @@ class TestXSOARIntegration(unittest.TestCase):
         mock_get.return_value.json.return_value = {'status': 'healthy'}
         mock_get.return_value.raise_for_status.return_value = None
         
-        self.assertEqual(self.client._base_url, self.base_url)
+        self.assertEqual(self.client._base_url, self.BASE_URL)
         self.assertIn('Authorization', self.client._headers)
         self.assertIn('Bearer', self.client._headers['Authorization'])
-        
+        # Pooling and retries are mounted on the session BaseClient created
+        adapter = self.client._session.get_adapter(self.BASE_URL)
+        self.assertEqual(adapter._pool_maxsize, POOL_MAXSIZE)
+        self.assertEqual(adapter.max_retries.total, RETRY_TOTAL)
+        
+    def test_mock_client_is_specced(self):
+        """Test that the shared mock client rejects methods Client does not have"""
+        self.assertIsInstance(self.mock_client, Client)
+        with self.assertRaises(AttributeError):
+            self.mock_client.get_threat_intel
+    
     @patch('orasrs_integration.requests.get')
     def test_test_module_success(self, mock_get):
         """Test the test_module function with successful response"""
@@ -60,10 +144,10 @@ class TestXSOARIntegration(unittest.TestCase):
         mock_get.return_value.json.return_value = {'status': 'healthy'}
         
         # Create a mock client with mocked test_connection
-        mock_client = Mock()
+        mock_client = self.mock_client
         mock_client.test_connection.return_value = {'status': 'healthy'}
         
-        result = test_module(mock_client)
+        result = orasrs_integration.test_module(mock_client)
         self.assertEqual(result, 'ok')
     
     @patch('orasrs_integration.requests.get')
@@ -75,12 +159,19 @@ class TestXSOARIntegration(unittest.TestCase):
         mock_get.return_value.json.return_value = {'status': 'unhealthy'}
         
         # Create a mock client with mocked test_connection
-        mock_client = Mock()
+        mock_client = self.mock_client
         mock_client.test_connection.return_value = {'status': 'unhealthy'}
         
-        result = test_module(mock_client)
+        result = orasrs_integration.test_module(mock_client)
         self.assertNotEqual(result, 'ok')
     
+    def test_test_connection_reads_health_body(self):
+        """Test that the health check GETs the body, so a degraded server fails test_module"""
+        with patch.object(self.client, '_request', return_value={'status': 'degraded'}) as request:
+            self.assertNotEqual(orasrs_integration.test_module(self.client), 'ok')
+        
+        self.assertEqual(request.call_args[0][0], 'GET')
+    
     @patch('orasrs_integration.requests.get')
     def test_get_threat_intelligence_command(self, mock_get):
         """Test the get_threat_intelligence_command function"""
@@ -103,7 +194,7 @@ class TestXSOARIntegration(unittest.TestCase):
         }
         mock_get.return_value.json.return_value = mock_threats
         
-        mock_client = Mock()
+        mock_client = self.mock_client
         mock_client.get_threat_intelligence.return_value = mock_threats
         
         args = {'limit': '10'}
@@ -123,6 +214,34 @@ class TestXSOARIntegration(unittest.TestCase):
         self.assertEqual(first_threat['CredibilityScore'], 0.85)
         self.assertEqual(first_threat['ConsensusVerified'], True)
     
+    def test_get_threat_intelligence_command_partial_record(self):
+        """Test that threat records missing fields fall back to defaults"""
+        self.mock_client.get_threat_intelligence.return_value = {
+            'threats': [{'id': 'threat-456', 'source_ip': '192.168.1.101'}]
+        }
+        
+        result = get_threat_intelligence_command(self.mock_client, {})
+        
+        threat = result.outputs[0]
+        self.assertEqual(threat['ID'], 'threat-456')
+        self.assertEqual(threat['SourceIP'], '192.168.1.101')
+        self.assertEqual(threat['CredibilityScore'], 0.0)
+        self.assertEqual(threat['ConsensusVerified'], False)
+        self.assertIsNone(threat['EvidenceHash'])
+    
+    @patch('orasrs_integration.tableToMarkdown')
+    def test_get_threat_intelligence_command_lite(self, mock_table):
+        """Test that lite mode returns a summary line without rendering a table"""
+        self.mock_client.get_threat_intelligence.return_value = {
+            'threats': [{'id': 'threat-123'}, {'id': 'threat-456'}]
+        }
+        
+        result = get_threat_intelligence_command(self.mock_client, {'lite': 'true'})
+        
+        mock_table.assert_not_called()
+        self.assertEqual(result.readable_output, "OraSRS Threat Intelligence (2 threats found)")
+        self.assertEqual(len(result.outputs), 2)
+    
     @patch('orasrs_integration.requests.get')
     def test_get_consensus_verification_command(self, mock_get):
         """Test the get_consensus_verification_command function"""
@@ -137,7 +256,7 @@ class TestXSOARIntegration(unittest.TestCase):
         }
         mock_get.return_value.json.return_value = mock_response
         
-        mock_client = Mock()
+        mock_client = self.mock_client
         mock_client.get_consensus_verification.return_value = mock_response
         
         args = {'threat_id': 'threat-123'}
@@ -153,6 +272,98 @@ class TestXSOARIntegration(unittest.TestCase):
         self.assertEqual(output['TotalVerifiers'], 5)
         self.assertEqual(output['ConsensusPercentage'], 0.8)
     
+    def test_get_threat_intel_with_consensus_command(self):
+        """Test that consensus results are merged into the threat outputs by ID"""
+        mock_client = self.mock_client
+        mock_client.get_threat_intelligence.return_value = {
+            'threats': [
+                {'id': 'threat-123', 'threat_type': 'Malware', 'credibility_score': 0.85},
+                {'id': 'threat-456', 'threat_type': 'DDoS', 'credibility_score': 0.92}
+            ]
+        }
+        mock_client.get_consensus_verification_bulk.return_value = {
+            'threat-123': {'consensus_status': 'verified', 'confidence_score': 0.9},
+            'threat-456': Exception("API Error")
+        }
+        
+        result = get_threat_intel_with_consensus_command(mock_client, {'limit': '10'})
+        
+        mock_client.get_consensus_verification_bulk.assert_called_once_with(['threat-123', 'threat-456'])
+        self.assertEqual(len(result.outputs), 2)
+        self.assertEqual(result.outputs[0]['Consensus']['ConsensusStatus'], 'verified')
+        self.assertEqual(result.outputs[1]['Consensus']['ErrorMessage'], 'API Error')
+    
+    def test_get_consensus_verification_command_bulk(self):
+        """Test that a comma-separated threat_id list is resolved with one bulk lookup"""
+        mock_client = self.mock_client
+        mock_client.get_consensus_verification_bulk.return_value = {
+            'threat-123': {'consensus_status': 'verified', 'confidence_score': 0.9},
+            'threat-456': {'consensus_status': 'disputed', 'confidence_score': 0.3}
+        }
+        
+        result = get_consensus_verification_command(mock_client, {'threat_id': 'threat-123,threat-456'})
+        
+        mock_client.get_consensus_verification_bulk.assert_called_once_with(['threat-123', 'threat-456'])
+        mock_client.get_consensus_verification.assert_not_called()
+        self.assertEqual([output['ThreatID'] for output in result.outputs], ['threat-123', 'threat-456'])
+        self.assertEqual(result.outputs[1]['ConsensusStatus'], 'disputed')
+    
+    def test_get_consensus_verification_command_bulk_missing_ids(self):
+        """Test that IDs missing from, or null in, the bulk results still get an error row"""
+        self.mock_client.get_consensus_verification_bulk.return_value = {
+            'threat-123': {'consensus_status': 'verified'},
+            'threat-456': None
+        }
+        
+        result = get_consensus_verification_command(
+            self.mock_client, {'threat_id': 'threat-123,threat-456,threat-789'}
+        )
+        
+        self.assertEqual([output['ThreatID'] for output in result.outputs], ['threat-123', 'threat-456', 'threat-789'])
+        self.assertEqual(result.outputs[0]['ConsensusStatus'], 'verified')
+        for output in result.outputs[1:]:
+            self.assertEqual(output['ErrorMessage'], 'not returned by bulk endpoint')
+    
+    def test_bulk_consensus_falls_back_on_404(self):
+        """Test that a missing bulk endpoint is detected once and per-threat lookups are used"""
+        not_found = DemistoException("Error in API call [404] - Not Found", res=Mock(status_code=404))
+        with patch.object(self.client, '_request', side_effect=not_found) as request, \
+                patch.object(self.client, 'get_consensus_verification_many', return_value={'threat-123': {}}) as many:
+            self.client.get_consensus_verification_bulk(['threat-123'])
+            self.client.get_consensus_verification_bulk(['threat-123'])
+        
+        request.assert_called_once()
+        self.assertEqual(many.call_count, 2)
+    
+    def test_consensus_responses_cached(self):
+        """Test that repeated consensus lookups within the TTL are served from the cache"""
+        with patch.object(self.client, '_request', return_value={'consensus_status': 'verified'}) as request:
+            first = self.client.get_consensus_verification('threat-123')
+            second = self.client.get_consensus_verification('threat-123')
+            self.client.get_consensus_verification('threat-456')
+        
+        self.assertIs(first, second)
+        self.assertEqual(request.call_count, 2)
+    
+    def test_cache_disabled_with_zero_ttl(self):
+        """Test that a TTL of 0 sends every lookup to the API"""
+        client = Client(base_url=self.BASE_URL, api_key=self.API_KEY, verify_ssl=False, cache_ttl=0)
+        with patch.object(client, '_request', return_value={}) as request:
+            client.get_upstream_intelligence()
+            client.get_upstream_intelligence()
+        
+        self.assertEqual(request.call_count, 2)
+    
+    def test_parse_cache_ttl(self):
+        """Test ttl_seconds parsing: unset uses the default, 0 disables, junk is rejected"""
+        self.assertEqual(parse_cache_ttl(None), 10)
+        self.assertEqual(parse_cache_ttl(''), 10)
+        self.assertEqual(parse_cache_ttl('0'), 0.0)
+        self.assertEqual(parse_cache_ttl('2.5'), 2.5)
+        for value in ('ten', '-1'):
+            with self.assertRaises(DemistoException):
+                parse_cache_ttl(value)
+    
     @patch('orasrs_integration.requests.post')
     def test_submit_threat_evidence_command(self, mock_post):
         """Test the submit_threat_evidence_command function"""
@@ -164,7 +375,7 @@ class TestXSOARIntegration(unittest.TestCase):
         }
         mock_post.return_value.json.return_value = mock_response
         
-        mock_client = Mock()
+        mock_client = self.mock_client
         mock_client.submit_threat_evidence.return_value = mock_response
         
         args = {
@@ -184,6 +395,49 @@ class TestXSOARIntegration(unittest.TestCase):
         self.assertEqual(output['Status'], 'submitted')
         self.assertEqual(output['Message'], 'Threat evidence submitted successfully')
     
+    def test_submit_threat_evidence_bulk_command(self):
+        """Test that an evidence batch is submitted in one call with one output per record"""
+        mock_client = self.mock_client
+        mock_client.submit_threat_evidence_bulk.return_value = [
+            {'id': 'new-threat-456', 'status': 'submitted'},
+            Exception("API Error")
+        ]
+        
+        args = {
+            'evidence_batch': json.dumps([
+                {'source_ip': '192.168.1.200', 'threat_type': 'DDoS', 'context': 'DDoS attack detected'},
+                {'source_ip': '192.168.1.201', 'threat_type': 'Malware', 'context': 'Malware beacon'}
+            ])
+        }
+        result = submit_threat_evidence_bulk_command(mock_client, args)
+        
+        submitted = mock_client.submit_threat_evidence_bulk.call_args[0][0]
+        self.assertEqual([evidence['source_ip'] for evidence in submitted], ['192.168.1.200', '192.168.1.201'])
+        self.assertEqual(submitted[0]['threat_level'], 'Warning')
+        self.assertEqual(result.outputs[0]['SubmittedThreatID'], 'new-threat-456')
+        self.assertEqual(result.outputs[1]['Status'], 'error')
+    
+    def test_submit_threat_evidence_bulk_command_rejects_bad_batches(self):
+        """Test that malformed batches are rejected before anything is submitted"""
+        bad_batches = [
+            ('{"source_ip": "192.168.1.200"}', 'JSON array'),
+            ('[{"source_ip": "192.168.1.200", "threat_type": "DDoS", "context": "x"}, "oops"]', 'evidence_batch[1]'),
+            ('[{"source_ip": "192.168.1.200", "context": "x"}]', 'evidence_batch[0] is missing required fields: threat_type'),
+        ]
+        for batch, message in bad_batches:
+            with self.subTest(batch=batch):
+                with self.assertRaises(DemistoException) as ctx:
+                    submit_threat_evidence_bulk_command(self.mock_client, {'evidence_batch': batch})
+                self.assertIn(message, str(ctx.exception))
+        self.mock_client.submit_threat_evidence_bulk.assert_not_called()
+    
+    def test_bulk_submit_rejects_misaligned_results(self):
+        """Test that a bulk reply without one result per record is treated as an error"""
+        evidence = [{'source_ip': '192.168.1.200'}, {'source_ip': '192.168.1.201'}]
+        with patch.object(self.client, '_request', return_value={'results': [{'id': 'only-one'}]}):
+            with self.assertRaises(DemistoException):
+                self.client.submit_threat_evidence_bulk(evidence)
+    
     @patch('orasrs_integration.requests.get')
     def test_get_upstream_intelligence_command(self, mock_get):
         """Test the get_upstream_intelligence_command function"""
@@ -205,7 +459,7 @@ class TestXSOARIntegration(unittest.TestCase):
         }
         mock_get.return_value.json.return_value = mock_response
         
-        mock_client = Mock()
+        mock_client = self.mock_client
         mock_client.get_upstream_intelligence.return_value = mock_response
         
         args = {}
@@ -242,75 +496,66 @@ class TestXSOARIntegration(unittest.TestCase):
     
     def test_integration_yaml_commands(self):
         """Test that the integration YAML has all required commands"""
-        yaml_path = '/home/Great/SRS-Protocol/xsoar_integration/orasrs_integration.yml'
-        self.assertTrue(os.path.exists(yaml_path), "Integration YAML file should exist")
-        
-        with open(yaml_path, 'r') as f:
-            yaml_content = f.read()
+        self.assertIsNotNone(self._yaml, "Integration YAML file should exist")
         
         # Check for required commands
-        self.assertIn('orasrs-get-threat-intelligence', yaml_content)
-        self.assertIn('orasrs-get-consensus-verification', yaml_content)
-        self.assertIn('orasrs-submit-threat-evidence', yaml_content)
-        self.assertIn('orasrs-get-upstream-intelligence', yaml_content)
+        required = {
+            'orasrs-get-threat-intelligence',
+            'orasrs-get-consensus-verification',
+            'orasrs-submit-threat-evidence',
+            'orasrs-get-upstream-intelligence',
+        }
+        missing = {token for token in required if token not in self._yaml}
+        self.assertFalse(missing, f"Missing commands: {sorted(missing)}")
     
     def test_integration_yaml_configuration(self):
         """Test that the integration YAML has proper configuration"""
-        yaml_path = '/home/Great/SRS-Protocol/xsoar_integration/orasrs_integration.yml'
-        self.assertTrue(os.path.exists(yaml_path), "Integration YAML file should exist")
-        
-        with open(yaml_path, 'r') as f:
-            yaml_content = f.read()
+        self.assertIsNotNone(self._yaml, "Integration YAML file should exist")
         
         # Check for required configuration fields
-        self.assertIn('url', yaml_content)
-        self.assertIn('api_key', yaml_content)
-        self.assertIn('insecure', yaml_content)
-        self.assertIn('OraSRS v2.0 Threat Intelligence', yaml_content)
+        required = {'url', 'api_key', 'insecure', 'OraSRS v2.0 Threat Intelligence'}
+        missing = {token for token in required if token not in self._yaml}
+        self.assertFalse(missing, f"Missing configuration fields: {sorted(missing)}")
 
 
 class TestXSOARIntegrationExceptionHandling(unittest.TestCase):
     """Test exception handling in the XSOAR Integration"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Build the autospec'd client shared by the tests once."""
+        cls.mock_client = create_autospec(Client, instance=True)
+    
     def setUp(self):
-        """Set up test fixtures before each test method."""
-        self.base_url = "https://api.orasrs.example.com"
-        self.api_key = "test-api-key"
+        """Clear return values and side effects left by the previous test."""
+        self.mock_client.reset_mock(return_value=True, side_effect=True)
         
     @patch('orasrs_integration.requests.get')
     def test_exception_in_get_threat_intelligence(self, mock_get):
         """Test exception handling in get_threat_intelligence_command"""
         mock_get.side_effect = Exception("Connection error")
         
-        mock_client = Mock()
-        mock_client.get_threat_intelligence.side_effect = Exception("API Error")
+        mock_client = self.mock_client
+        mock_client.get_threat_intelligence.side_effect = DemistoException("API Error")
         
         args = {'limit': '10'}
         
-        # Should not raise an exception, but return an error result
-        try:
-            result = get_threat_intelligence_command(mock_client, args)
-            # If we get here, the function handled the exception properly
-            self.assertIsNotNone(result)
-        except Exception as e:
-            # If an exception is raised, it should be handled by the main function
-            self.fail(f"Exception was not handled properly: {str(e)}")
+        # Command functions let API errors propagate; main() turns them into an error result
+        with self.assertRaises(DemistoException):
+            get_threat_intelligence_command(mock_client, args)
     
     @patch('orasrs_integration.requests.get')
     def test_exception_in_get_consensus_verification(self, mock_get):
         """Test exception handling in get_consensus_verification_command"""
         mock_get.side_effect = Exception("Connection error")
         
-        mock_client = Mock()
-        mock_client.get_consensus_verification.side_effect = Exception("API Error")
+        mock_client = self.mock_client
+        mock_client.get_consensus_verification.side_effect = DemistoException("API Error")
         
         args = {'threat_id': 'test-id'}
         
-        try:
-            result = get_consensus_verification_command(mock_client, args)
-            self.assertIsNotNone(result)
-        except Exception as e:
-            self.fail(f"Exception was not handled properly: {str(e)}")
+        with self.assertRaises(DemistoException):
+            get_consensus_verification_command(mock_client, args)
 
 
 if __name__ == '__main__':